@@ -0,0 +1,119 @@
+import arrow
+import asyncio
+import math
+import time
+
+
+class Clock:
+    """
+    source of the current time and of the scheduler waits
+    """
+
+    def time(self):
+        """
+        :return: epoch seconds
+        """
+        raise NotImplementedError
+
+    def utcnow(self):
+        return arrow.Arrow.utcfromtimestamp(self.time())
+
+    async def sleep(self, seconds: float = None):
+        raise NotImplementedError
+
+    async def sleep_until(self, timestamp: float = None, wakeup=None):
+        """
+        wait until timestamp, or until wakeup is set
+        :param timestamp: epoch seconds, None to wait for wakeup only
+        :param wakeup: asyncio.Event
+        """
+        raise NotImplementedError
+
+    def expired(self):
+        """
+        :return: True when the scheduler should stop ticking
+        """
+        return False
+
+
+class SystemClock(Clock):
+    """
+    wall clock and real sleeps
+    """
+
+    def time(self):
+        return time.time()
+
+    def utcnow(self):
+        return arrow.utcnow()
+
+    async def sleep(self, seconds: float = None):
+        await asyncio.sleep(seconds)
+
+    async def sleep_until(self, timestamp: float = None, wakeup=None):
+        timeout = None
+        if timestamp is not None:
+            timeout = max(timestamp - time.time(), 0)
+        try:
+            await asyncio.wait_for(wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+
+class SimulatedClock(Clock):
+    """
+    virtual time, advanced by the scheduler waits instead of real time.
+    a wait returns at once and moves the time to its end, so a HEAP scheduler
+    jumps straight from one due job to the next.
+    only the scheduler ticks advance it, job coroutines still run in real time
+    """
+
+    def __init__(self, start=None, end=None):
+        """
+        :param start: arrow time or epoch seconds, default to now
+        :param end: arrow time or epoch seconds, the scheduler stops once
+        :       the clock reaches it, default to never stop
+        """
+        # whole microseconds, as arrow times, so time() and utcnow() agree
+        self.micros = self.to_micros(time.time() if start is None else start)
+        self.end = None if end is None else self.to_micros(end)
+
+    @staticmethod
+    def to_micros(value=None):
+        if not isinstance(value, (int, float)):
+            value = value.timestamp()
+        micros = math.ceil(value * 1000000)
+        # the product may round down, time() must not be before value
+        while micros / 1000000 < value:
+            micros += 1
+        return micros
+
+    def time(self):
+        return self.micros / 1000000
+
+    def advance(self, seconds: float = None):
+        self.micros += round(seconds * 1000000)
+
+    async def sleep(self, seconds: float = None):
+        self.advance(max(seconds, 0))
+        # let the tasks spawned by this tick run
+        await asyncio.sleep(0)
+
+    async def sleep_until(self, timestamp: float = None, wakeup=None):
+        await asyncio.sleep(0)
+        if wakeup is not None and wakeup.is_set():
+            return
+        if timestamp is None:
+            if self.end is not None:
+                self.micros = max(self.micros, self.end)
+                return
+            await wakeup.wait()
+            return
+        self.micros = max(self.micros, self.to_micros(timestamp))
+
+    def expired(self):
+        return self.end is not None and self.micros >= self.end
+
+
+# clock of jobs without scheduler
+SYSTEM_CLOCK = SystemClock()
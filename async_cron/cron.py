@@ -0,0 +1,198 @@
+import calendar
+import datetime
+import functools
+
+# (name, lowest value, highest value) of the five crontab fields
+FIELDS = (
+    ('minute', 0, 59),
+    ('hour', 0, 23),
+    ('day', 1, 31),
+    ('month', 1, 12),
+    ('week', 0, 7),
+)
+
+MONTH_NAMES = {
+    name: i + 1
+    for i, name in enumerate(('jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul',
+                              'aug', 'sep', 'oct', 'nov', 'dec'))
+}
+WEEK_NAMES = {
+    name: i
+    for i, name in enumerate(('sun', 'mon', 'tue', 'wed', 'thu', 'fri',
+                              'sat'))
+}
+
+# give up searching the next match after this many years
+MAX_SEARCH_YEARS = 8
+
+
+def next_bit(mask: int, start: int):
+    """
+    lowest set bit of mask at or above start
+    :return: bit position, None if there is none
+    """
+    mask >>= start
+    if not mask:
+        return None
+    return start + (mask & -mask).bit_length() - 1
+
+
+def parse_value(value: str, names: dict = None):
+    value = value.lower()
+    if names and value in names:
+        return names[value]
+    return int(value)
+
+
+def parse_field(field: str, low: int, high: int, names: dict = None):
+    """
+    compile one crontab field into a bitmask, bit n set means value n matches
+    support `*`, `10`, `1-5`, `*/10`, `1-30/5`, `10/5` and lists of them
+    :param field: field expression, list items separated by comma or `;`
+    """
+    mask = 0
+    for item in field.replace(';', ',').split(','):
+        item = item.strip()
+        if not item:
+            raise ValueError(f"empty item in cron field: {field}")
+        value_range, slash, step = item.partition('/')
+        step = int(step) if step else 1
+        if step < 1:
+            raise ValueError(f"cron step must be positive: {item}")
+        if value_range == '*':
+            first, last = low, high
+        elif '-' in value_range:
+            first, last = value_range.split('-')
+            first, last = parse_value(first, names), parse_value(last, names)
+        else:
+            first = parse_value(value_range, names)
+            last = high if slash else first
+        if not low <= first <= last <= high:
+            raise ValueError(f"cron value out of range {low}-{high}: {item}")
+        for i in range(first, last + 1, step):
+            mask |= 1 << i
+    return mask
+
+
+class CronExpression:
+    """
+    compiled crontab expression, every field is a bitmask,
+    so matching is O(1) and searching the next match scans bits
+    """
+
+    __slots__ = ('expression', 'minutes', 'hours', 'days', 'months', 'weeks',
+                 'any_day', 'any_week', 'last_day')
+
+    def __init__(self, expression: str = None):
+        """
+        :param expression: five fields, minute hour day month week.
+        :       either separated by blank, with comma separated lists,
+        :       as in crontab: `0,30 9-17 * * mon-fri`,
+        :       or separated by comma, with `;` separated lists,
+        :       as in cron file: `0;30,9-17,*,*,mon-fri`.
+        :       `L` in the day field is the last day of the month
+        """
+        self.expression = expression
+        if len(expression.split()) > 1:
+            fields = expression.split()
+        else:
+            fields = expression.split(',')
+        if len(fields) != 5:
+            raise ValueError(f"cron needs 5 fields: {expression}")
+        minute, hour, day, month, week = [i.strip() for i in fields]
+        self.minutes = parse_field(minute, *FIELDS[0][1:])
+        self.hours = parse_field(hour, *FIELDS[1][1:])
+        days = [i for i in day.replace(';', ',').split(',')
+                if i.strip().upper() != 'L']
+        self.last_day = len(days) < len(day.replace(';', ',').split(','))
+        self.days = parse_field(','.join(days), *FIELDS[2][1:]) if days else 0
+        self.months = parse_field(month, *FIELDS[3][1:], names=MONTH_NAMES)
+        weeks = parse_field(week, *FIELDS[4][1:], names=WEEK_NAMES)
+        # both 0 and 7 are sunday
+        if weeks & (1 << 7):
+            weeks = (weeks | 1) & 0x7f
+        self.weeks = weeks
+        self.any_day = day.startswith('*')
+        self.any_week = week.startswith('*')
+
+    def __repr__(self):
+        return f"CronExpression({self.expression!r})"
+
+    def __eq__(self, other):
+        if not isinstance(other, CronExpression):
+            return False
+        return (self.minutes, self.hours, self.days, self.months,
+                self.weeks, self.any_day, self.any_week, self.last_day) == (
+                    other.minutes, other.hours, other.days, other.months,
+                    other.weeks, other.any_day, other.any_week,
+                    other.last_day)
+
+    def __hash__(self):
+        return hash((self.minutes, self.hours, self.days, self.months,
+                     self.weeks, self.last_day))
+
+    def match_day(self, date=None):
+        """
+        day of month and day of week follow crontab rules:
+        if both are restricted, either of them matching is enough
+        """
+        day_ok = (self.days >> date.day) & 1
+        if not day_ok and self.last_day:
+            day_ok = date.day == calendar.monthrange(date.year, date.month)[1]
+        week_ok = (self.weeks >> ((date.weekday() + 1) % 7)) & 1
+        if self.any_day or self.any_week:
+            return bool(day_ok and week_ok)
+        return bool(day_ok or week_ok)
+
+    def match(self, time=None):
+        """
+        :param time: datetime or arrow time, in the cron timezone
+        """
+        return bool((self.minutes >> time.minute) & 1
+                    and (self.hours >> time.hour) & 1
+                    and (self.months >> time.month) & 1
+                    and self.match_day(time))
+
+    def next_after(self, time=None):
+        """
+        first matching minute at or after time
+        :param time: naive datetime, wall clock of the cron timezone
+        :return: naive datetime, None if nothing matches
+        """
+        if time.second or time.microsecond:
+            time = time.replace(second=0, microsecond=0)
+            time += datetime.timedelta(minutes=1)
+        limit = time.year + MAX_SEARCH_YEARS
+        one_day = datetime.timedelta(days=1)
+        while time.year <= limit:
+            month = next_bit(self.months, time.month)
+            if month is None:
+                time = datetime.datetime(time.year + 1, 1, 1)
+                continue
+            if month != time.month:
+                time = datetime.datetime(time.year, month, 1)
+            if not self.match_day(time):
+                time = datetime.datetime(time.year, time.month,
+                                         time.day) + one_day
+                continue
+            hour = next_bit(self.hours, time.hour)
+            if hour is None:
+                time = datetime.datetime(time.year, time.month,
+                                         time.day) + one_day
+                continue
+            if hour != time.hour:
+                time = time.replace(hour=hour, minute=0)
+            minute = next_bit(self.minutes, time.minute)
+            if minute is None:
+                time = time.replace(minute=0) + datetime.timedelta(hours=1)
+                continue
+            return time.replace(minute=minute)
+        return None
+
+
+@functools.lru_cache(maxsize=4096)
+def compile_cron(expression: str = None):
+    """
+    compile expression once, crontab lines sharing it share the result
+    """
+    return CronExpression(expression)
@@ -0,0 +1,117 @@
+import asyncio
+import collections
+import heapq
+import itertools
+import time
+
+# group of the jobs without one
+DEFAULT_GROUP = 'default'
+
+
+class Dispatcher:
+    """
+    concurrency budget of a scheduler shared by job groups.
+    while every slot is taken, runs wait in the queue of their group and
+    free slots go to the groups by weighted fair queueing: while both have
+    runs waiting, a group of weight 2 starts twice the runs of a group of
+    weight 1, and an idle group does not save its share for later.
+    inside a group, runs start by priority, then in arrival order
+    """
+
+    def __init__(self, limit: int = None, weights: dict = None, clock=None):
+        """
+        :param limit: max number of runs executing at once
+        :param weights: group name -> weight, default to 1
+        :param clock: callable returning seconds, measures the waits
+        """
+        self.limit = limit
+        self.weights = weights or {}
+        self.clock = clock or time.monotonic
+        self.running = 0
+        # group -> runs executing
+        self.active = collections.Counter()
+        # group -> heap of [-priority, seq, future, enqueued time],
+        # entries of cancelled waits are dropped when they reach the top
+        self.queues = {}
+        # runs waiting in all queues, cancelled ones excluded
+        self.waiting = 0
+        # start time fair queueing, group -> virtual start of its next run
+        self.tags = {}
+        self.virtual = 0
+        self._seq = itertools.count()
+
+    async def acquire(self, group: str = DEFAULT_GROUP, priority: int = 0):
+        """
+        wait for a slot, release it with release(group)
+        """
+        if self.running < self.limit and not self.waiting:
+            self.start(group)
+            return
+        future = asyncio.get_event_loop().create_future()
+        entry = [-priority, next(self._seq), future, self.clock()]
+        heapq.heappush(self.queues.setdefault(group, []), entry)
+        self.waiting += 1
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.cancelled():
+                self.waiting -= 1
+            else:
+                # the slot was given just before the cancel
+                self.release(group)
+            raise
+
+    def start(self, group: str = None):
+        self.running += 1
+        self.active[group] += 1
+
+    def release(self, group: str = None):
+        self.running -= 1
+        self.active[group] -= 1
+        self.dispatch()
+
+    def dispatch(self):
+        """
+        give the free slots to the waiting runs
+        """
+        while self.running < self.limit and self.waiting:
+            group = self.next_group()
+            _, _, future, _ = heapq.heappop(self.queues[group])
+            self.waiting -= 1
+            tag = max(self.virtual, self.tags.get(group, 0))
+            self.virtual = tag
+            self.tags[group] = tag + 1 / self.weights.get(group, 1)
+            self.start(group)
+            future.set_result(None)
+
+    def next_group(self):
+        """
+        :return: waiting group with the earliest virtual start
+        """
+        best = best_tag = None
+        for group, queue in self.queues.items():
+            while queue and queue[0][2].cancelled():
+                heapq.heappop(queue)
+            if not queue:
+                continue
+            tag = max(self.virtual, self.tags.get(group, 0))
+            if best is None or tag < best_tag:
+                best, best_tag = group, tag
+        return best
+
+    def queued(self, group: str = None):
+        """
+        :return: number of runs of group waiting for a slot
+        """
+        return sum(1 for entry in self.queues.get(group, ())
+                   if not entry[2].cancelled())
+
+    def lag(self, group: str = None):
+        """
+        :return: seconds the oldest waiting run of group has waited
+        """
+        enqueued = [entry[3] for entry in self.queues.get(group, ())
+                    if not entry[2].cancelled()]
+        if not enqueued:
+            return 0
+        return max(self.clock() - min(enqueued), 0)
@@ -0,0 +1,102 @@
+import json
+import logging
+
+# scheduler lifecycle events
+ADDED = 'added'
+FIRED = 'fired'
+FINISHED = 'finished'
+FAILED = 'failed'
+SKIPPED = 'skipped'
+RETRY = 'retry'
+REMOVED = 'removed'
+
+# log level of every event
+LEVELS = {
+    ADDED: logging.DEBUG,
+    FIRED: logging.INFO,
+    FINISHED: logging.DEBUG,
+    FAILED: logging.ERROR,
+    SKIPPED: logging.DEBUG,
+    RETRY: logging.INFO,
+    REMOVED: logging.INFO,
+}
+
+
+class Event:
+    """
+    log record message of an event, formatted only when a handler
+    writes it, as text by str() or as a dict by as_dict()
+    """
+
+    __slots__ = ('event', 'job', 'fields')
+
+    def __init__(self, event: str = None, job: str = None, fields=None):
+        self.event = event
+        self.job = job
+        self.fields = fields
+
+    def as_dict(self):
+        result = {'event': self.event, 'job': self.job}
+        for key, value in self.fields.items():
+            if hasattr(value, 'isoformat'):
+                value = value.isoformat()
+            elif not isinstance(value, (int, float, str, bool, type(None))):
+                value = repr(value)
+            result[key] = value
+        return result
+
+    def __str__(self):
+        fields = self.fields
+        if self.event == FIRED and 'time' in fields:
+            # the legacy running line, humanized only when written
+            return (f"runing:{self.job}:"
+                    f"{fields['time'].humanize(locale=fields.get('locale'))}")
+        text = ' '.join(
+            f'{key}={value!r}' if isinstance(value, BaseException) else
+            f'{key}={value}' for key, value in fields.items()
+            if key != 'locale')
+        return f'{self.event}:{self.job} {text}'.rstrip()
+
+
+class EventLog:
+    """
+    emits events as records of a logger, nothing is built for events
+    whose level the logger does not handle
+    """
+
+    def __init__(self, logger: logging.Logger = None, levels: dict = None):
+        """
+        :param logger: default to the async_cron.events logger
+        :param levels: event -> log level, overrides LEVELS
+        """
+        self.logger = logger or logging.getLogger(f'{__package__}.events')
+        self.levels = dict(LEVELS, **(levels or {}))
+
+    def enabled(self, event: str = FIRED):
+        return self.logger.isEnabledFor(self.levels[event])
+
+    def emit(self, event: str = None, job: str = None, exc_info=None,
+             **fields):
+        level = self.levels[event]
+        if self.logger.isEnabledFor(level):
+            self.logger.log(level, Event(event, job, fields),
+                            exc_info=exc_info)
+
+
+class JSONFormatter(logging.Formatter):
+    """
+    format records as json lines, events keep their fields
+    """
+
+    def format(self, record=None):
+        message = record.msg
+        if isinstance(message, Event):
+            data = message.as_dict()
+            data.pop('locale', None)
+        else:
+            data = {'message': record.getMessage()}
+        data['ts'] = record.created
+        data['level'] = record.levelname
+        if record.exc_info:
+            data['exc'] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False)
@@ -0,0 +1,21 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# run sync job functions on the event loop thread
+INLINE = 'inline'
+# run sync job functions in a thread pool
+THREAD = 'thread'
+# run sync job functions in a process pool,
+# they and their arguments must be picklable
+PROCESS = 'process'
+
+
+def create_executor(kind: str = THREAD, max_workers: int = None):
+    """
+    :param kind: THREAD or PROCESS
+    :param max_workers: pool size, default to the concurrent.futures default
+    """
+    if kind == THREAD:
+        return ThreadPoolExecutor(max_workers=max_workers)
+    if kind == PROCESS:
+        return ProcessPoolExecutor(max_workers=max_workers)
+    raise ValueError(f"unknown executor kind: {kind}")
@@ -1,75 +1,153 @@
 import arrow
+from arrow.parser import DateTimeParser, TzinfoParser
 import inspect
 import functools
+import math
 import asyncio
 import uuid
 from dateutil import tz
-import datetime
 from .units import SECOND, MINUTE, HOUR, DAY, MONTH, WEEK
+from .cron import compile_cron
+from .clock import SYSTEM_CLOCK
+from .dispatch import DEFAULT_GROUP
+from .zone import (Zone, local_datetime, from_local_datetime, day_of_month,
+                   shift_months)
 import logging
 
 logger = logging.getLogger(__package__)
 
+# what a run does while max_instances runs of the job are still active
+# SKIP: do not start it
+SKIP = 'skip'
+# QUEUE: start it once a running instance finishes,
+#        at most max_instances runs wait
+QUEUE = 'queue'
+# REPLACE: cancel the oldest running instance
+REPLACE = 'replace'
 
-class CronJob:
+# what a run does with scheduled runs it missed, e.g. after a stalled loop,
+# runs later than misfire_grace are dropped by every policy
+# ONCE: one run covers the missed runs
+ONCE = 'once'
+# ALL: every missed run is run, at most MAX_CATCH_UP of them
+ALL = 'all'
+# SKIP (as above): missed runs are dropped, the latest one only runs while
+#       it is current, at most tolerance seconds late
+
+# max number of missed runs run at once by ALL
+MAX_CATCH_UP = 1000
+
+# returned by run when it started no run, refused or dropped by misfire
+NOT_RUN = object()
+
+# seconds of the units shifted by a fixed step
+UNIT_SECONDS = {SECOND: 1, MINUTE: 60, HOUR: 3600}
+
+# give up searching the next run after this many days
+MAX_SEARCH_DAYS = 366 * 5
+
+# give up aligning a first run to the epoch grid after this many tries
+MAX_ALIGN = 1000
+
+
+@functools.lru_cache(maxsize=None)
+def get_tzinfo(tz_name=None):
     """
-    periodic job
+    tzinfo object of tz_name, parsed once and cached
+    :param tz_name: timezone string or tzinfo, local timezone if empty
     """
+    if not tz_name:
+        return tz.tzlocal()
+    if isinstance(tz_name, str):
+        return TzinfoParser.parse(tz_name)
+    return tz_name
 
-    def __init__(self,
-                 name: str = None,
-                 interval: int = 1,
-                 scheduler=None,
-                 loop=None,
-                 tz: str = None,
-                 run_total: int = None,
-                 tolerance: int = 10):
-        """
-        :param name: crontab name
-        :param interval: crontab apply interval
-        :param scheduler: crontab scheduler instance for now ,it is useless
-        :param loop: asyncio running loop
-        :param tz: timezone info. support string tz format
-        :param run_total: crontab task total running times,
-        :       with this parameter,you can limit its cron task count
-        :param tolerance: crontab tolerance. time tolerance, within is range,
-        :       task will still be applied
-        """
-        self.name = name or str(uuid.uuid1())
-        self.interval = interval
-        self.job_func = None
-        self.unit = None
-        self.at_time = (None, None)
-        self.at_exact_time = None
-        self.last_run = None
-        self.next_run = None
-        self.run_count = 0
-        self.run_total = run_total
-        self.start_hour = None
-        self.end_hour = None
-        self.period = None
-        self.week_day = None
-        self.month_day = None
-        self.scheduler = scheduler
-        self.loop = loop or asyncio.get_event_loop()
-        self.gte_day = False
-        self.tz = tz
-        # tolerance means if now - at_exact_time <= tolerance,
-        # this job will still be applied
-        self.tolerance = datetime.timedelta(seconds=tolerance)
 
-    def __repr__(self):
-        return f"{self.name}-{self.interval}:{self.unit}-{self.at_time}\
-            -{self.at_exact_time}-{self.run_total}"
+@functools.lru_cache(maxsize=None)
+def get_zone(tz_name=None):
+    """
+    Zone of tz_name, its offset table is shared by every job of the timezone
+    """
+    return Zone(get_tzinfo(tz_name))
 
-    def __eq__(self, job=None):
-        if (self.interval == job.interval and self.unit == job.unit
-                and self.at_time == job.at_time
-                and self.run_total == job.run_total
-                and self.at_exact_time == job.at_exact_time):
-            return True
-        else:
-            return False
+
+def day_minutes(at_time=(None, None), start_hour=None, end_hour=None):
+    """
+    matching (hour, minute) windows of a day, in order,
+    follows the calendar conditions of CronJob.decide_run
+    :return: list of (hour, first_minute, last_minute)
+    """
+    hour, minute = at_time
+    if hour is not None and minute is not None:
+        return [(hour, minute, minute)]
+    low = 0 if start_hour is None else int(start_hour)
+    high = 23 if end_hour is None else int(end_hour)
+    if hour is not None:
+        if low <= hour <= high:
+            return [(hour, 0, 59)]
+        return []
+    if minute is not None:
+        return [(i, minute, minute) for i in range(max(low, 0),
+                                                   min(high, 23) + 1)]
+    return [(i, 0, 59) for i in range(max(low, 0), min(high, 23) + 1)]
+
+
+def first_fire_after(now,
+                     zone=None,
+                     at_time=(None, None),
+                     start_hour=None,
+                     end_hour=None,
+                     week_day=None,
+                     month_day=None):
+    """
+    earliest instant not before now matching the calendar conditions
+    :param now: epoch seconds
+    :param zone: async_cron.zone.Zone the conditions apply to
+    :return: epoch seconds, None if nothing matches within MAX_SEARCH_DAYS
+    """
+    windows = day_minutes(at_time, start_hour, end_hour)
+    if not windows:
+        return None
+    day = int(zone.to_local(now) // 86400)
+    for _ in range(MAX_SEARCH_DAYS):
+        # 1970-01-01 is a thursday
+        if ((week_day is None or week_day == (day + 3) % 7)
+                and (not month_day or month_day == day_of_month(day))):
+            midnight = day * 86400
+            for hour, first, last in windows:
+                end = zone.to_utc(midnight + hour * 3600 + last * 60 + 60,
+                                  now)
+                if now < end:
+                    return max(now, zone.to_utc(midnight + hour * 3600 +
+                                                first * 60, now))
+        day += 1
+    return None
+
+
+def close_coroutines(coroutines=None, task=None):
+    """
+    done callback of a task running wrapped coroutines, closes the inner
+    ones a task cancelled before it awaited them, e.g. replaced by REPLACE
+    """
+    for coro in coroutines:
+        coro.close()
+
+
+class JobBuilder:
+    """
+    fluent api to describe when a job runs, shared by CronJob and SlimJob
+    """
+
+    __slots__ = ()
+
+    # async_cron.retry.Retry of failed runs, None to use the scheduler one
+    retry = None
+    # seconds fires are delayed by, None to use the scheduler ones
+    spread = None
+    jitter = None
+    # group sharing the scheduler concurrency, higher priorities start first
+    group = DEFAULT_GROUP
+    priority = 0
 
     def check_gte_day(self):
         if self.unit in (SECOND, MINUTE, HOUR):
@@ -77,113 +155,233 @@ class CronJob:
         else:
             self.gte_day = True
 
-    def get_now(self):
-        now = arrow.utcnow()
-        if self.tz:
-            now = now.to(self.tz)
-        else:
-            now = now.to(tz.tzlocal())
-        return now
+    def get_now(self, utcnow=None):
+        """
+        :param utcnow: utc time snapshot, default to the scheduler clock
+        """
+        if utcnow is None:
+            utcnow = self.clock.utcnow()
+        return utcnow.to(get_tzinfo(self.tz))
+
+    @property
+    def clock(self):
+        if self.scheduler is None:
+            return SYSTEM_CLOCK
+        return self.scheduler.clock
 
     def get_tz_time(self, arw=None):
-        if self.tz:
-            arw = arw.to(self.tz)
-        else:
-            arw = arw.to(tz.tzlocal())
-        return arw
+        return arw.to(get_tzinfo(self.tz))
 
-    def decide_run(self):
-        now = self.get_now()
-        if self.at_exact_time:
-            # check if it is a exact run func
-            if (now >= self.at_exact_time
-                    and now - self.at_exact_time <= self.tolerance):
-                return True
-            else:
-                return False
+    def timestamp_of(self, now=None):
+        """
+        :param now: epoch seconds, arrow or aware datetime,
+        :       default to the clock time
+        :return: epoch seconds
+        """
+        if now is None:
+            return self.clock.time()
+        if isinstance(now, (int, float)):
+            return now
+        return now.timestamp()
 
-        if self.next_run:
-            if now >= self.next_run:
-                # IMPORTANT BUGFIX: Always check weekday conditions for weekly jobs,
-                # even after next_run is set. The original code only checked weekdays
-                # on the first run, then ignored them completely for subsequent runs.
-                if self.week_day is not None and self.week_day != now.weekday():
-                    return False
-                if self.month_day and self.month_day != now.day:
-                    return False
-                return True
+    def to_arrow(self, timestamp: float = None):
+        """
+        arrow time in the job timezone, for display and the public api
+        """
+        if timestamp is None:
+            return None
+        return arrow.Arrow.fromtimestamp(timestamp, get_tzinfo(self.tz))
+
+    @property
+    def zone(self):
+        return get_zone(self.tz)
+
+    def has_window(self):
+        """
+        :return: True if runs are limited to some days or hours
+        """
+        return (self.week_day is not None or bool(self.month_day)
+                or self.start_hour is not None or self.end_hour is not None)
+
+    def fire_time(self, timestamp: float = None):
+        """
+        hook converting a computed fire time, SlimJob keeps integers
+        """
+        return timestamp
+
+    def _fire_after(self, now, next_run, run_count):
+        """
+        first scheduled run not before now
+        :param next_run: run the schedule is anchored to, None before the
+        :       first run
+        :return: epoch seconds, None if the job will never run again
+        """
+        if self.run_total and run_count >= self.run_total:
+            return None
+        if self.at_exact_time:
+            if now - self.at_exact_time <= self.tolerance:
+                return self.at_exact_time
+            return None
+        if self.cron_expression is not None:
+            if next_run:
+                return max(now, next_run)
+            if self.cron_match(now):
+                # the scheduled minute, the same on every node
+                return self.fire_time(self.minute_start(now))
+            fire = self.cron_next(now)
         else:
-            if self.month_day and self.month_day != now.day:
-                return False
-            if self.week_day is not None and self.week_day != now.weekday():
-                return False
-            now_datetime = now.datetime
-            hour, minute = self.at_time
-            if hour is not None and minute is not None:
-                if (now_datetime.hour == hour
-                        and now_datetime.minute == minute):
-                    return True
-            elif hour is not None:
-                if now_datetime.hour == hour:
-                    if self.start_hour is not None and self.end_hour is not None:
-                        if int(self.start_hour) <= hour <= int(self.end_hour):
-                            return True
-                    elif self.start_hour is not None:
-                        if int(self.start_hour) <= hour:
-                            return True
-                    elif self.end_hour is not None:
-                        if hour <= int(self.end_hour):
-                            return True
-                    else:
-                        return True
-            elif minute is not None:
-                if now_datetime.minute == minute:
-                    hour = now_datetime.hour
-                    if self.start_hour is not None and self.end_hour is not None:
-                        if int(self.start_hour) <= hour <= int(self.end_hour):
-                            return True
-                    elif self.start_hour is not None:
-                        if int(self.start_hour) <= hour:
-                            return True
-                    elif self.end_hour is not None:
-                        if hour <= int(self.end_hour):
-                            return True
-                    else:
-                        return True
-            else:
-                return True
-        return False
+            if next_run:
+                if not self.has_window():
+                    return max(now, next_run)
+                now = max(now, next_run)
+            fire = first_fire_after(now,
+                                    self.zone,
+                                    at_time=self.at_time,
+                                    start_hour=self.start_hour,
+                                    end_hour=self.end_hour,
+                                    week_day=self.week_day,
+                                    month_day=self.month_day)
+            if (not next_run and fire == now and self.unit != SECOND
+                    and self.at_time[1] is not None):
+                # inside the one minute window of the at time,
+                # its start is the scheduled run
+                fire = self.minute_start(now)
+        return None if fire is None else self.fire_time(fire)
 
-    def remove(self):
-        if self.run_total:
-            if self.run_count >= self.run_total:
-                return True
-        return False
+    def minute_start(self, now: float = None):
+        """
+        :return: epoch seconds of the start of the wall clock minute of now
+        """
+        return now - self.zone.to_local(now) % 60
 
-    def go(self, job_func, *args, **kwargs):
-        self.job_func = functools.partial(job_func, *args, **kwargs)
-        return self
+    def epoch_fire(self, now: float = None):
+        """
+        first run not before the next scheduled run after now, on the grid
+        of interval units counted from the epoch in the job timezone,
+        the same on every node. days start at midnight, or the at time,
+        weeks on monday or the week day, months on the first or the month
+        day
+        :return: epoch seconds, None if the job is a cron or exact time
+        :       job, or will never run
+        """
+        if self.cron_expression is not None or self.at_exact_time:
+            return None
+        step = UNIT_SECONDS.get(self.unit)
+        if step is None:
+            return self.calendar_fire(now)
+        step *= self.interval
+        # hour steps keep the minute of the at time
+        offset = 0
+        if self.unit == HOUR and self.at_time[1] is not None:
+            offset = self.at_time[1] * 60
+        zone = self.zone
+        fire = None
+        for _ in range(MAX_ALIGN):
+            fire = self._fire_after(now, None, self.run_count)
+            if fire is None:
+                return None
+            local = zone.to_local(fire)
+            aligned = offset + math.ceil((local - offset) / step) * step
+            if aligned == local:
+                return fire
+            now = zone.to_utc(aligned, fire)
+        # the calendar conditions never meet the grid
+        return fire
 
-    def run(self):
-        if self.job_func is None:
-            return
-        now = self.get_now()
-        # recodrd run args
-        self.last_run = now
-        self.run_count += 1
-        # run job_func
-        tmp_result = self.job_func()
-        if inspect.iscoroutine(tmp_result):
-            self.loop.create_task(tmp_result)
-        self.gen_next_run()
-        return tmp_result
+    def calendar_fire(self, now: float = None):
+        """
+        epoch_fire of days, weeks and months
+        """
+        fire = self._fire_after(now, None, self.run_count)
+        if fire is None:
+            return None
+        hour, minute = self.at_time
+        if hour is None:
+            hour = int(self.start_hour or 0)
+        time_of_day = hour * 3600 + (minute or 0) * 60
+        zone = self.zone
+        local = zone.to_local(fire)
+        day = int(local // 86400)
+        if day * 86400 + time_of_day < local:
+            day += 1
+        for _ in range(MAX_SEARCH_DAYS):
+            if self.on_grid(day):
+                fire = zone.to_utc(day * 86400 + time_of_day, now)
+                if self._fire_after(fire, None, self.run_count) == fire:
+                    return self.fire_time(fire)
+            day += 1
+        return None
 
-    def gen_next_run(self):
-        if not self.at_exact_time:
-            if not isinstance(self.unit, str):
-                raise Exception(
-                    f"self.unit must be specified: self.unit->{self.unit}")
-            self.next_run = self.last_run.shift(**{self.unit: self.interval})
+    def on_grid(self, day: int = None):
+        """
+        :param day: days since the epoch in the job timezone
+        :return: True if day is a run day of the interval grid
+        """
+        if self.unit == DAY:
+            return day % self.interval == 0
+        if self.unit == WEEK:
+            # 1970-01-01 is a thursday, weeks start on monday
+            week_day = self.week_day or 0
+            return ((day + 3) % 7 == week_day
+                    and (day + 3) // 7 % self.interval == 0)
+        if self.unit == MONTH:
+            date = local_datetime(day * 86400)
+            return (date.day == (self.month_day or 1)
+                    and ((date.year - 1970) * 12 + date.month - 1)
+                    % self.interval == 0)
+        return True
+
+    def shift_next_run(self, last_run: float = None):
+        """
+        :param last_run: epoch seconds
+        :return: epoch seconds of the run interval units later,
+        :       seconds, minutes and hours are a fixed step,
+        :       days, weeks and months keep the wall clock time
+        """
+        if self.cron_expression is not None:
+            local = self.zone.to_local(last_run)
+            return self.cron_next_local(local - local % 60 + 60, last_run)
+        step = UNIT_SECONDS.get(self.unit)
+        if step is not None:
+            return last_run + step * self.interval
+        zone = self.zone
+        local = zone.to_local(last_run)
+        if self.unit == MONTH:
+            local = shift_months(local, self.interval)
+        elif self.unit == WEEK:
+            local += self.interval * 7 * 86400
+        elif self.unit == DAY:
+            local += self.interval * 86400
+        else:
+            raise ValueError(f"unknown unit: {self.unit}")
+        # back to the at time, a run moved by a skipped time does not drift
+        hour, minute = self.at_time
+        if hour is not None:
+            local += (hour - local % 86400 // 3600) * 3600
+        if minute is not None:
+            local += (minute - local % 3600 // 60) * 60
+        return zone.to_utc(local)
+
+    def cron_match(self, now: float = None):
+        return self.cron_expression.match(
+            local_datetime(self.zone.to_local(now)))
+
+    def cron_next(self, now: float = None):
+        """
+        first minute at or after now matching the cron expression
+        :param now: epoch seconds
+        """
+        return self.cron_next_local(self.zone.to_local(now), now)
+
+    def cron_next_local(self, local: float = None, earliest: float = None):
+        """
+        :param local: wall clock seconds of the job timezone
+        :param earliest: epoch seconds the run can not be before
+        """
+        time = self.cron_expression.next_after(local_datetime(local))
+        if time is None:
+            return None
+        return self.zone.to_utc(from_local_datetime(time), earliest)
 
     def split_time(self, time_string: str = None):
         hour, minute = time_string.split(':')
@@ -191,7 +389,14 @@ class CronJob:
         minute = int(minute) if minute else None
         return (hour, minute)
 
-    def at(self, time_string: str = None, time_shift=8):
+    def at(self, time_string: str = None, time_shift: float = None):
+        """
+        :param time_string: `HH:MM` run every day or period, or a date time
+        :       like `2019-01-15 16:12` run once. a date time is a wall
+        :       clock time of the job timezone unless it has an utc offset
+        :param time_shift: hours east of utc of a date time without offset,
+        :       instead of the job timezone. the previous releases used 8
+        """
         if time_string is None:
             pass
         else:
@@ -199,10 +404,15 @@ class CronJob:
             first, *_ = time_string.split(':')
             if len(first) > 2:
                 try:
-                    arrow_time = arrow.get(time_string)
-                    arrow_time = self.get_tz_time(arrow_time).shift(
-                        hours=-time_shift)
-                    self.at_exact_time = arrow_time
+                    time = DateTimeParser().parse_iso(time_string)
+                    if time.tzinfo is not None:
+                        timestamp = time.timestamp()
+                    elif time_shift is not None:
+                        timestamp = (from_local_datetime(time) -
+                                     time_shift * 3600)
+                    else:
+                        timestamp = self.zone.to_utc(from_local_datetime(time))
+                    self.at_exact_time = timestamp
                     self.run_total = 1
                 except Exception as tmp:
                     logger.exception(tmp)
@@ -215,6 +425,14 @@ class CronJob:
                     logger.info(f'{self.name} parse hour and minute error')
         return self
 
+    def cron(self, expression: str = None):
+        """
+        run at the minutes matching a crontab expression,
+        see async_cron.cron.CronExpression for the syntax
+        """
+        self.cron_expression = compile_cron(expression)
+        return self
+
     def every(self, interval: int = None):
         if interval is None:
             pass
@@ -272,3 +490,431 @@ class CronJob:
     def month(self):
         self.unit = MONTH
         return self
+
+
+class CronJob(JobBuilder):
+    """
+    periodic job
+    """
+
+    # created on the first queued run, kept off the instance dict until then,
+    # a 30th attribute would make every job dict unshared and twice as big
+    _semaphore = None
+
+    def __init__(self,
+                 name: str = None,
+                 interval: int = 1,
+                 scheduler=None,
+                 loop=None,
+                 tz: str = None,
+                 run_total: int = None,
+                 tolerance: int = 10,
+                 max_instances: int = None,
+                 overlap: str = SKIP,
+                 executor: str = None,
+                 misfire: str = ONCE,
+                 misfire_grace: int = None,
+                 retry=None,
+                 spread: float = None,
+                 jitter: float = None,
+                 group: str = None,
+                 priority: int = None):
+        """
+        :param name: crontab name
+        :param interval: crontab apply interval
+        :param scheduler: crontab scheduler instance for now ,it is useless
+        :param loop: asyncio running loop
+        :param tz: timezone of the calendar conditions, an IANA name like
+        :       `Europe/Berlin`, an offset like `+08:00` or a tzinfo,
+        :       default to the local timezone. unknown names raise at once
+        :param run_total: crontab task total running times,
+        :       with this parameter,you can limit its cron task count
+        :param tolerance: crontab tolerance. time tolerance, within is range,
+        :       task will still be applied. also how late the run of a SKIP
+        :       job may be
+        :param max_instances: max number of concurrent runs of a coroutine job
+        :param overlap: SKIP, QUEUE or REPLACE, what to do with a new run
+        :       when max_instances runs are still active
+        :param executor: name of a scheduler executor running this job if it
+        :       is sync, INLINE runs it on the event loop, default to the
+        :       scheduler executor
+        :param misfire: ONCE, ALL or SKIP, how scheduled runs missed
+        :       because the scheduler was late are run
+        :param misfire_grace: seconds a run may be late and still count as
+        :       on time, missed runs later than it are dropped by every
+        :       policy. default to no limit, exact time jobs use tolerance
+        :param retry: async_cron.retry.Retry of failed runs,
+        :       default to the retry of the scheduler
+        :param spread: fires are delayed by a stable offset below spread
+        :       seconds derived from the name, jobs sharing a schedule
+        :       fire at different offsets. default to the scheduler spread
+        :param jitter: fires are delayed by a random offset below jitter
+        :       seconds, drawn for every fire. default to the scheduler jitter
+        :param group: name of the group of the job, groups share the
+        :       scheduler max_concurrency by their weight. default to
+        :       DEFAULT_GROUP
+        :param priority: due jobs with higher priorities start first, and
+        :       get the free slots of their group first. default to 0
+        """
+        if overlap not in (SKIP, QUEUE, REPLACE):
+            raise ValueError(f"unknown overlap policy: {overlap}")
+        if misfire not in (ONCE, ALL, SKIP):
+            raise ValueError(f"unknown misfire policy: {misfire}")
+        self.name = name or str(uuid.uuid1())
+        self.interval = interval
+        self.job_func = None
+        self.unit = None
+        self.at_time = (None, None)
+        # times are epoch seconds, converted to arrow only for display
+        self.at_exact_time = None
+        self.last_run = None
+        # scheduled time of the last run, next runs are anchored to it
+        self.last_fire = None
+        self.next_run = None
+        # next scheduled fire time, kept current by refresh_next_fire
+        self.next_fire = None
+        self.run_count = 0
+        self.run_total = run_total
+        self.start_hour = None
+        self.end_hour = None
+        self.period = None
+        self.week_day = None
+        self.month_day = None
+        self.cron_expression = None
+        self.scheduler = scheduler
+        self.loop = loop or asyncio.get_event_loop()
+        self.gte_day = False
+        self.tz = tz
+        get_tzinfo(tz)
+        # tolerance means if now - at_exact_time <= tolerance seconds,
+        # this job will still be applied
+        self.tolerance = tolerance
+        self.max_instances = max_instances
+        self.overlap = overlap
+        self.executor = executor
+        self.misfire = misfire
+        self.misfire_grace = misfire_grace
+        # active tasks of this job, in start order
+        self.tasks = {}
+        if retry is not None:
+            self.retry = retry
+        if spread is not None:
+            self.spread = spread
+        if jitter is not None:
+            self.jitter = jitter
+        if group is not None:
+            self.group = group
+        if priority is not None:
+            self.priority = priority
+
+    def __repr__(self):
+        return f"{self.name}-{self.interval}:{self.unit}-{self.at_time}\
+            -{self.at_exact_time}-{self.run_total}"
+
+    def __eq__(self, job=None):
+        if (self.interval == job.interval and self.unit == job.unit
+                and self.at_time == job.at_time
+                and self.run_total == job.run_total
+                and self.at_exact_time == job.at_exact_time
+                and self.cron_expression == job.cron_expression):
+            return True
+        else:
+            return False
+
+    def __getstate__(self):
+        """
+        jobs are pickled without loop, scheduler and active tasks,
+        so they can be sent to another process
+        """
+        state = self.__dict__.copy()
+        state.update(loop=None, scheduler=None, tasks={})
+        state.pop('_semaphore', None)
+        return state
+
+    def decide_run(self, now=None):
+        """
+        :param now: current epoch seconds or arrow time,
+        :       default to the clock time
+        """
+        now = self.timestamp_of(now)
+        if self.next_fire is None:
+            if self.refresh_next_fire(now) is None:
+                return False
+        if now < self.next_fire:
+            return False
+        if self.at_exact_time:
+            # check if it is a exact run func
+            return now - self.next_fire <= self.tolerance
+        return True
+
+    def next_fire_after(self, now=None):
+        """
+        next absolute instant at which decide_run returns True,
+        an instant is the start of its matching window, or now itself
+        if now is already inside the window. a late run is due now
+        :param now: start of the search, default to the clock time
+        :return: arrow time, None if this job will never run again
+        """
+        return self.to_arrow(
+            self._fire_after(self.timestamp_of(now), self.next_run,
+                             self.run_count))
+
+    def refresh_next_fire(self, now=None):
+        """
+        scheduled time of the next run, it is earlier than now if the run
+        is late. before the first run it is searched from now
+        :return: epoch seconds, None if this job will never run again
+        """
+        if self.next_run is not None:
+            now = self.next_run
+        else:
+            now = self.timestamp_of(now)
+        self.next_fire = self._fire_after(now, self.next_run, self.run_count)
+        return self.next_fire
+
+    def fixed_step(self):
+        """
+        :return: seconds between two runs if they are a fixed step apart
+        """
+        if (self.cron_expression is None and not self.has_window()
+                and self.unit in UNIT_SECONDS):
+            return UNIT_SECONDS[self.unit] * self.interval
+        return None
+
+    def following_fire(self, fire=None):
+        """
+        scheduled run following the one at fire
+        """
+        next_run = self.shift_next_run(fire)
+        if next_run is None or self.cron_expression is not None:
+            return next_run
+        return first_fire_after(next_run,
+                                self.zone,
+                                at_time=self.at_time,
+                                start_hour=self.start_hour,
+                                end_hour=self.end_hour,
+                                week_day=self.week_day,
+                                month_day=self.month_day)
+
+    def due_fires(self, now=None):
+        """
+        scheduled runs not run yet, up to now
+        :return: (due runs oldest first, at most MAX_CATCH_UP of them,
+        :       first scheduled run after now or None)
+        """
+        fire = now if self.next_fire is None else self.next_fire
+        if self.at_exact_time:
+            return [fire], None
+        self.check_unit()
+        step = self.fixed_step()
+        if step:
+            count = max(int((now - fire) // step) + 1, 1)
+            fires = [
+                fire + step * i
+                for i in range(max(count - MAX_CATCH_UP, 0), count)
+            ]
+            return fires, fire + step * count
+        fires = [fire]
+        following = self.following_fire(fire)
+        while following is not None and following <= now:
+            fires.append(following)
+            if len(fires) > MAX_CATCH_UP:
+                fires.pop(0)
+            following = self.following_fire(following)
+        return fires, following
+
+    def upcoming(self, count: int = 10, now=None):
+        """
+        list the next runs of this job, without changing its state
+        :param count: max number of runs
+        :param now: start of the search, default to the clock time
+        :return: list of arrow times
+        """
+        now = self.timestamp_of(now)
+        next_run, run_count = self.next_run, self.run_count
+        result = []
+        while len(result) < count:
+            fire = self._fire_after(now, next_run, run_count)
+            if fire is None:
+                break
+            result.append(self.to_arrow(fire))
+            if self.at_exact_time or (self.cron_expression is None
+                                      and not isinstance(self.unit, str)):
+                break
+            run_count += 1
+            next_run = self.shift_next_run(fire)
+            now = fire + 1e-6
+        return result
+
+    def get_state(self):
+        """
+        :return: (last_run, next_run, run_count), times as epoch seconds
+        """
+        return (self.last_run, self.next_run, self.run_count)
+
+    def set_state(self, state=None):
+        """
+        :param state: as returned by get_state
+        """
+        self.last_run, self.next_run, self.run_count = state
+        self.next_fire = None
+
+    def remove(self):
+        if self.run_total:
+            if self.run_count >= self.run_total:
+                return True
+        return False
+
+    def go(self, job_func, *args, **kwargs):
+        self.job_func = functools.partial(job_func, *args, **kwargs)
+        return self
+
+    def run(self, now=None, execute: bool = True):
+        """
+        run the job for its due scheduled runs, following misfire
+        :param now: current epoch seconds or arrow time,
+        :       default to the clock time
+        :param execute: False if the runs are claimed by another node,
+        :       they are counted and skipped
+        :return: result of the last run started, NOT_RUN if none started
+        """
+        if self.job_func is None:
+            return NOT_RUN
+        now = self.timestamp_of(now)
+        if self.next_fire is None:
+            self.refresh_next_fire(now)
+        fires, following = self.due_fires(now)
+        grace = self.misfire_grace
+        on_time = [i for i in fires if grace is None or now - i <= grace]
+        if self.misfire == ALL:
+            count = len(on_time)
+        elif self.misfire == SKIP:
+            limit = self.tolerance
+            if grace is not None:
+                limit = min(limit, grace)
+            count = 1 if now - fires[-1] <= limit else 0
+        else:
+            count = min(len(on_time), 1)
+        if self.run_total:
+            count = min(count, self.run_total - self.run_count)
+        if count < len(fires):
+            logger.info(f'{self.name} missed {len(fires)} runs, run {count}')
+        # recodrd run args
+        self.last_run = now
+        self.last_fire = fires[-1]
+        tmp_result = NOT_RUN
+        try:
+            if execute:
+                for _ in range(count):
+                    result = self.start_run()
+                    if result is not NOT_RUN:
+                        tmp_result = result
+            else:
+                self.run_count += count
+        finally:
+            # a failed run still moves the job to its next run
+            if not self.at_exact_time:
+                self.next_run = following
+            self.refresh_next_fire(now)
+        return tmp_result
+
+    def start_run(self):
+        """
+        :return: result of the run, NOT_RUN if it was refused
+        """
+        if not self.accept_run():
+            return NOT_RUN
+        self.run_count += 1
+        return self.call()
+
+    def call(self):
+        """
+        call job_func once, coroutines and executor runs become tasks
+        """
+        executor = self.get_executor()
+        if (executor is not None
+                and not asyncio.iscoroutinefunction(self.job_func)):
+            return self.spawn(self.run_in_executor(executor))
+        tmp_result = self.job_func()
+        if inspect.iscoroutine(tmp_result):
+            tmp_result = self.spawn(tmp_result)
+        return tmp_result
+
+    def accept_run(self):
+        """
+        apply max_instances and the scheduler limits to a new run
+        :return: True if the run may start
+        """
+        if self.scheduler is not None and not self.scheduler.accept_run(self):
+            return False
+        if not self.max_instances or len(self.tasks) < self.max_instances:
+            return True
+        if self.overlap == REPLACE:
+            task = next(iter(self.tasks))
+            self.tasks.pop(task)
+            task.cancel()
+            logger.info(f'{self.name} replaces its oldest run')
+            return True
+        if (self.overlap == QUEUE
+                and len(self.tasks) < self.max_instances * 2):
+            return True
+        logger.info(f'{self.name} skipped, {len(self.tasks)} runs active')
+        return False
+
+    def get_executor(self):
+        """
+        :return: executor for sync runs, None to run them inline
+        """
+        if self.scheduler is None:
+            return None
+        return self.scheduler.get_executor(self.executor)
+
+    async def run_in_executor(self, executor=None):
+        loop = self.loop or asyncio.get_event_loop()
+        tmp_result = await loop.run_in_executor(executor, self.job_func)
+        if inspect.iscoroutine(tmp_result):
+            tmp_result = await tmp_result
+        return tmp_result
+
+    def spawn(self, coro=None):
+        """
+        start a coroutine of this job as a tracked task
+        """
+        wrap = None
+        if self.max_instances:
+            if self._semaphore is None:
+                self._semaphore = asyncio.Semaphore(self.max_instances)
+            wrap = self.limit
+        if self.scheduler is not None:
+            task = self.scheduler.spawn(self, coro, wrap)
+        elif wrap is not None:
+            task = (self.loop or asyncio.get_event_loop()).create_task(
+                wrap(coro))
+            task.add_done_callback(functools.partial(close_coroutines,
+                                                     (coro, )))
+        else:
+            task = (self.loop or asyncio.get_event_loop()).create_task(coro)
+        self.tasks[task] = None
+        task.add_done_callback(self.task_done)
+        return task
+
+    async def limit(self, coro=None):
+        async with self._semaphore:
+            return await coro
+
+    def task_done(self, task=None):
+        self.tasks.pop(task, None)
+
+    def check_unit(self):
+        if self.cron_expression is None and not isinstance(self.unit, str):
+            raise Exception(
+                f"self.unit must be specified: self.unit->{self.unit}")
+
+    def gen_next_run(self):
+        """
+        next run anchored to the scheduled time of the last run
+        """
+        if not self.at_exact_time:
+            self.check_unit()
+            self.next_run = self.following_fire(self.last_fire
+                                                or self.last_run)
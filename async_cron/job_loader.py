@@ -1,6 +1,7 @@
 from .job import CronJob
-from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from .executors import create_executor, THREAD, PROCESS
 import asyncio
+import os
 import subprocess
 import logging
 
@@ -14,41 +15,173 @@ class JobLoader:
                  log_path=None,
                  log_level=None,
                  thread=True,
+                 async_subprocess=False,
+                 timeout=None,
                  **kwargs):
+        """
+        :param thread: run commands in a thread pool, else a process pool
+        :param async_subprocess: run commands with asyncio subprocesses
+        :       instead of a pool, output is streamed to the log files
+        :       and no pool worker is held while a command runs
+        :param timeout: default command timeout in seconds,
+        :       commands running longer are killed
+        """
         self.name = name
-        if thread:
-            self.executor = ThreadPoolExecutor()
-        else:
-            self.executor = ProcessPoolExecutor()
+        self.thread = thread
+        self.executor = create_executor(THREAD if thread else PROCESS)
         self.loop = loop or asyncio.get_event_loop()
         self.log_path = log_path.strip('/')
+        self.async_subprocess = async_subprocess
+        self.timeout = timeout
+        # job name -> job, as last applied by sync_jobs
+        self.jobs = {}
+        # job name -> (stdout log file, stderr log file)
+        self.log_files = {}
+        # job name -> number of its commands running
+        self.running = {}
+        # names of removed jobs, their log files close after their runs
+        self.closing = set()
+
+    def __getstate__(self):
+        """
+        jobs of a loader hold it, so it is pickled with them,
+        without its executor, loop, open files and loaded jobs
+        """
+        state = self.__dict__.copy()
+        state.update(executor=None, loop=None, log_files={}, jobs={},
+                     running={}, closing=set())
+        return state
+
+    def __setstate__(self, state=None):
+        self.__dict__.update(state)
+        self.executor = create_executor(THREAD if self.thread else PROCESS)
 
     async def load(self):
         raise NotImplementedError
 
     @staticmethod
-    def sub_process_command(command, env, name, log_path):
+    def sub_process_command(command, env, name, log_path, timeout=None):
         out_path_name = log_path + '/' + f'{name}_out.txt'
         err_path_name = log_path + '/' + f'{name}_err.txt'
         out_log_file = open(out_path_name, 'a')
         err_log_file = open(err_path_name, 'a')
-        subprocess.run(command.split(','),
-                       env=env,
-                       stdout=out_log_file,
-                       stderr=err_log_file)
+        try:
+            result = subprocess.run(command.split(','),
+                                    env=env,
+                                    stdout=out_log_file,
+                                    stderr=err_log_file,
+                                    timeout=timeout)
+            returncode = result.returncode
+        except subprocess.TimeoutExpired:
+            logger.info(f'{name} killed after {timeout}s timeout')
+            returncode = None
         out_log_file.close()
         err_log_file.close()
+        return returncode
+
+    def open_log_files(self, name=None, log_path=None):
+        """
+        log files of a command stay open between runs
+        """
+        if name not in self.log_files:
+            self.log_files[name] = (
+                open(log_path + '/' + f'{name}_out.txt', 'ab'),
+                open(log_path + '/' + f'{name}_err.txt', 'ab'),
+            )
+        return self.log_files[name]
+
+    def close_log_files(self, name=None):
+        """
+        close the log files of a removed job, once its running commands
+        are done
+        """
+        if self.running.get(name):
+            self.closing.add(name)
+            return
+        self.closing.discard(name)
+        files = self.log_files.pop(name, None)
+        if files is not None:
+            for log_file in files:
+                log_file.close()
+
+    def close(self):
+        for out_log_file, err_log_file in self.log_files.values():
+            out_log_file.close()
+            err_log_file.close()
+        self.log_files.clear()
+        self.executor.shutdown(wait=False)
+
+    @staticmethod
+    async def pipe_to_file(stream=None, log_file=None):
+        while True:
+            data = await stream.read(65536)
+            if not data:
+                break
+            log_file.write(data)
+        log_file.flush()
+
+    async def async_sub_process_command(self,
+                                        command=None,
+                                        env=None,
+                                        name=None,
+                                        log_path=None,
+                                        timeout=None):
+        """
+        run command as asyncio subprocess
+        :return: exit status, None if killed after timeout
+        """
+        out_log_file, err_log_file = self.open_log_files(name, log_path)
+        self.running[name] = self.running.get(name, 0) + 1
+        try:
+            return await self.wait_sub_process(command, env, name, timeout,
+                                               out_log_file, err_log_file)
+        finally:
+            self.running[name] -= 1
+            if not self.running[name]:
+                del self.running[name]
+                if name in self.closing:
+                    self.close_log_files(name)
+
+    async def wait_sub_process(self, command=None, env=None, name=None,
+                               timeout=None, out_log_file=None,
+                               err_log_file=None):
+        process = await asyncio.create_subprocess_exec(
+            *command.split(','),
+            env=env,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE)
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(self.pipe_to_file(process.stdout,
+                                                 out_log_file),
+                               self.pipe_to_file(process.stderr,
+                                                 err_log_file),
+                               process.wait()), timeout)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            logger.info(f'{name} killed after {timeout}s timeout')
+            return None
+        except asyncio.CancelledError:
+            process.kill()
+            await process.wait()
+            raise
+        if process.returncode:
+            logger.info(f'{name} exit with status {process.returncode}')
+        return process.returncode
 
     def create_executor_task(self,
                              command=None,
                              env=None,
                              name=None,
-                             log_path=None):
-        logger.info('create_executor_task---start\n\n')
+                             log_path=None,
+                             timeout=None):
+        logger.debug('%s executor task start', name)
         try:
-            result = self.loop.run_in_executor(self.executor,
-                                               self.sub_process_command,
-                                               *(command, env, name, log_path))
+            loop = self.loop or asyncio.get_event_loop()
+            result = loop.run_in_executor(
+                self.executor, self.sub_process_command,
+                *(command, env, name, log_path, timeout))
         except Exception as tmp:
             logger.info('create_executor_task_exception')
             logger.exception(tmp)
@@ -64,27 +197,32 @@ class JobLoader:
 
     def parse(self, line_data):
         """
-                crontab           name job env total_times
-        example='*/2,*,*,*,* ceshi python,--name=12 aa=123,bb=345 10'
+                crontab           name job env total_times timeout
+        example='*/2,*,*,*,* ceshi python,--name=12 aa=123,bb=345 10 60'
         """
         try:
-            cron, name, command, *env_total = line_data.split(' ')
-            if len(env_total) == 2:
-                env, total_times = env_total
-                total_times = int(total_times)
-            else:
-                env = env_total[0]
-                total_times = None
+            cron, name, command, env, *total_timeout = line_data.split(' ')
+            total_times = None
+            timeout = self.timeout
+            if total_timeout:
+                total_times = int(total_timeout[0])
+            if len(total_timeout) > 1:
+                timeout = float(total_timeout[1])
             job = self.parse_cron(cron=cron,
                                   name=name,
                                   total_times=total_times)
             if job is not None:
                 env = self.parse_env(env_string=env)
-                job.go(self.create_executor_task,
+                if self.async_subprocess:
+                    job_func = self.async_sub_process_command
+                else:
+                    job_func = self.create_executor_task
+                job.go(job_func,
                        command=command,
                        env=env,
                        name=name,
-                       log_path=self.log_path)
+                       log_path=self.log_path,
+                       timeout=timeout)
             return job
         except Exception as tmp:
             logger.info('cron file format error')
@@ -92,70 +230,11 @@ class JobLoader:
             return None
 
     def parse_cron(self, cron=None, name=None, total_times=None):
-        minute, hour, day, month, week = [i.strip() for i in cron.split(',')]
-        month_every, month_at_time = self.parse_detail(month)
-        week_every, week_at_time = self.parse_detail(week)
-        day_every, day_at_time = self.parse_detail(day)
-        hour_every, hour_at_time = self.parse_detail(hour)
-        minute_every, minute_at_time = self.parse_detail(minute)
-
-        tmp_job = CronJob(name=name, run_total=total_times)
-        if (month_at_time and day_at_time and hour_at_time and minute_at_time):
-            tmp_job = tmp_job.at(f"{month_at_time}-{day_at_time}\
-                     {hour_at_time}:{minute_at_time}")
-            return tmp_job
-
-        if month != '*':
-            if month_every is None:
-                month_every = 1
-            tmp_job = tmp_job.every(month_every)
-            if day_at_time is not None:
-                tmp_job = tmp_job.month_day(day_at_time)
-            if hour_at_time is not None and minute is not None:
-                tmp_job = tmp_job.at_time(f'{hour_at_time}:{minute_at_time}')
-        elif week != '*':
-            if week_every is None:
-                month_every = 1
-            if week_at_time is not None:
-                tmp_job = tmp_job.week_day(week_at_time)
-            if hour_at_time is not None and minute is not None:
-                tmp_job = tmp_job.at_time(f'{hour_at_time}:{minute_at_time}')
-        elif day != '*':
-            if day_every is None:
-                day_every = 1
-            tmp_job = tmp_job.every(day_every).day
-            if hour_at_time is not None and minute is not None:
-                tmp_job = tmp_job.at_time(f'{hour_at_time}:{minute_at_time}')
-        elif hour != '*':
-            if hour_every is None:
-                hour_every = 1
-            tmp_job = tmp_job.every(hour_every).hour
-            if minute is not None:
-                tmp_job = tmp_job.at_time(f':{minute_at_time}')
-        elif minute != '*':
-            if minute_every is None:
-                minute_every = 1
-            tmp_job = tmp_job.every(minute_every).minute
-        if tmp_job.unit:
-            return tmp_job
-        else:
-            return None
-
-    def parse_detail(self, data=None):
-        data = data.split('/')
-        every = None
-        at_time = None
-        if len(data) > 1:
-            f_data, every = data
-        else:
-            at_time = data[0]
-        if every is not None:
-            if '*' not in every:
-                every = int(every)
-        if at_time is not None:
-            if '*' not in at_time:
-                at_time = int(at_time)
-        return every, at_time
+        """
+        cron fields are separated by comma, lists inside a field by `;`
+        example='0;30,9-17,*,*,1-5'
+        """
+        return CronJob(name=name, run_total=total_times).cron(cron)
 
     def gen_job(self, data=None):
         pass
@@ -163,31 +242,115 @@ class JobLoader:
     async def run(self, schedule=None):
         try:
             jobs = await self.load()
-            for job in jobs:
-                if isinstance(job, CronJob):
-                    self.add_job_schedule(job, schedule)
-            print(schedule.jobs)
+            if jobs is not None:
+                self.sync_jobs(jobs, schedule)
+                logger.debug('%s synced %d jobs', self.name, len(jobs))
         except KeyboardInterrupt:
             logger.info('keyboard exit')
             self.executor.shutdown()
+        except Exception as tmp:
+            # the next watch iteration loads again
+            logger.exception(tmp)
+            logger.info(f'{self.name} load error')
+
+    async def watch(self, schedule=None, interval: float = 1):
+        """
+        apply changes of the loaded jobs to schedule every interval
+        """
+        while True:
+            await self.run(schedule)
+            await asyncio.sleep(interval)
+
+    def sync_jobs(self, jobs=None, schedule=None):
+        """
+        add new jobs, delete removed ones and replace modified ones,
+        jobs loaded as the same object are unchanged and keep running.
+        a replaced job keeps run_count and last_run, and next_run too
+        if its timing did not change. jobs with run_total 0 are deleted
+        """
+        loaded = {job.name: job for job in jobs if isinstance(job, CronJob)}
+        deleted = []
+        added = []
+        for name in list(self.jobs):
+            if name not in loaded:
+                del self.jobs[name]
+                deleted.append(name)
+                self.close_log_files(name)
+        for name, job in loaded.items():
+            old_job = self.jobs.get(name)
+            if old_job is job:
+                continue
+            if old_job is not None:
+                deleted.append(name)
+                job.run_count = old_job.run_count
+                job.last_run = old_job.last_run
+                if job == old_job:
+                    job.next_run = old_job.next_run
+            self.jobs[name] = job
+            self.closing.discard(name)
+            if job.run_total == 0 or job.remove():
+                continue
+            added.append(job)
+        if deleted:
+            self.del_jobs_schedule(deleted, schedule)
+        if added:
+            self.add_jobs_schedule(added, schedule)
 
     @staticmethod
     def add_job_schedule(job, schedule):
         schedule.add_job(job)
 
+    @staticmethod
+    def add_jobs_schedule(jobs, schedule):
+        schedule.add_jobs(jobs)
+
+    @staticmethod
+    def del_jobs_schedule(names, schedule):
+        schedule.remove_jobs(names)
+
 
 class FileJobLoader(JobLoader):
     def __init__(self, file_path=None, **kwargs):
         super(FileJobLoader, self).__init__(**kwargs)
         self.file_path = file_path
+        # (mtime, size) of the file at the last load
+        self.file_stat = None
+        # cron line -> job parsed from it
+        self.line_jobs = {}
+
+    def __getstate__(self):
+        state = super(FileJobLoader, self).__getstate__()
+        state.update(file_stat=None, line_jobs={})
+        return state
 
     async def load(self):
+        """
+        :return: jobs of the file, None if the file did not change
+        :       since the last load or is missing, unchanged lines
+        :       give the same job
+        """
         result = []
         if self.file_path:
-            file = open(self.file_path, 'r')
-            crons = [i.strip('\n').strip() for i in file.readlines()]
-            for i in crons:
-                tmp_cron = self.parse(i)
-                if tmp_cron is not None:
-                    result.append(tmp_cron)
+            try:
+                stat = os.stat(self.file_path)
+            except FileNotFoundError:
+                # an editor saving by rename, keep the jobs applied last
+                logger.info(f'{self.file_path} not found, jobs kept')
+                return None
+            file_stat = (stat.st_mtime_ns, stat.st_size)
+            if file_stat == self.file_stat:
+                return None
+            line_jobs = {}
+            # stream the lines, large files are never held as a whole
+            with open(self.file_path, 'r') as file:
+                for i in file:
+                    i = i.strip()
+                    if not i:
+                        continue
+                    tmp_cron = self.line_jobs.get(i) or self.parse(i)
+                    if tmp_cron is not None:
+                        line_jobs[i] = tmp_cron
+                        result.append(tmp_cron)
+            self.line_jobs = line_jobs
+            self.file_stat = file_stat
         return result
@@ -0,0 +1,197 @@
+import heapq
+import os
+import sqlite3
+import time
+import urllib.parse
+
+
+class RunLock:
+    """
+    claims of scheduled runs shared by the scheduler nodes running
+    the same jobs. a slot is (job name, fire timestamp), the first node
+    claiming a slot runs it, the other nodes skip it.
+    methods are blocking, the scheduler calls them from a worker thread
+    """
+
+    def __init__(self, ttl: float = 86400, purge_interval: float = None):
+        """
+        :param ttl: seconds claims are kept after their fire time
+        :param purge_interval: seconds between two purges of the expired
+        :       claims, default to a tenth of ttl
+        """
+        self.ttl = ttl
+        self.purge_interval = ttl / 10 if purge_interval is None \
+            else purge_interval
+        self._purged = None
+
+    def claim(self, slots=None, node: str = None, now: float = None):
+        """
+        claim all due slots of one tick at once
+        :param slots: list of (job name, fire timestamp)
+        :param node: id of the claiming node
+        :param now: epoch seconds of the scheduler clock, claims expire
+        :       by it. default to the system time
+        :return: set of the slots won by node
+        """
+        raise NotImplementedError
+
+    def expiry(self, now: float = None):
+        """
+        :param now: epoch seconds of the scheduler clock
+        :return: fire timestamp the claims before are purged now, None if
+        :       the last purge is more recent than purge_interval
+        """
+        if now is None:
+            now = time.time()
+        if self._purged is not None and \
+                0 <= now - self._purged < self.purge_interval:
+            return None
+        self._purged = now
+        return now - self.ttl
+
+    def close(self):
+        pass
+
+
+class MemoryRunLock(RunLock):
+    """
+    keeps claims in memory, for schedulers sharing one process
+    and as reference implementation
+    """
+
+    def __init__(self, ttl: float = 86400):
+        super().__init__(ttl)
+        # slot -> node
+        self.claims = {}
+        # heap of (fire timestamp, job name) of the claims, oldest first
+        self._fires = []
+
+    def claim(self, slots=None, node: str = None, now: float = None):
+        expire = (time.time() if now is None else now) - self.ttl
+        fires = self._fires
+        while fires and fires[0][0] < expire:
+            fire, name = heapq.heappop(fires)
+            self.claims.pop((name, fire), None)
+        won = set()
+        for slot in slots:
+            owner = self.claims.get(slot)
+            if owner is None:
+                self.claims[slot] = owner = node
+                heapq.heappush(fires, (slot[1], slot[0]))
+            if owner == node:
+                won.add(slot)
+        return won
+
+
+class SQLiteRunLock(RunLock):
+    """
+    keeps claims in a sqlite file shared by the nodes,
+    every claim is one transaction
+    """
+
+    def __init__(self, path: str = 'async_cron_lock.db', ttl: float = 86400,
+                 timeout: float = 5, purge_interval: float = None):
+        """
+        :param timeout: seconds to wait for a lock held by another node
+        """
+        super().__init__(ttl, purge_interval)
+        self.path = path
+        self.connection = sqlite3.connect(path, timeout=timeout,
+                                          check_same_thread=False,
+                                          isolation_level=None)
+        self.connection.execute('CREATE TABLE IF NOT EXISTS run_claim ('
+                                'name TEXT, '
+                                'fire INTEGER, '
+                                'node TEXT, '
+                                'PRIMARY KEY (name, fire))')
+        self.connection.execute('CREATE INDEX IF NOT EXISTS run_claim_fire '
+                                'ON run_claim (fire)')
+
+    def claim(self, slots=None, node: str = None, now: float = None):
+        if not slots:
+            return set()
+        expire = self.expiry(now)
+        connection = self.connection
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            if expire is not None:
+                connection.execute('DELETE FROM run_claim WHERE fire < ?',
+                                   (expire, ))
+            connection.executemany(
+                'INSERT OR IGNORE INTO run_claim (name, fire, node) '
+                'VALUES (?, ?, ?)', [(name, fire, node)
+                                     for name, fire in slots])
+            won = set()
+            for slot in slots:
+                row = connection.execute(
+                    'SELECT node FROM run_claim WHERE name = ? AND fire = ?',
+                    slot).fetchone()
+                if row is not None and row[0] == node:
+                    won.add(slot)
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        return won
+
+    def close(self):
+        self.connection.close()
+
+
+class FileRunLock(RunLock):
+    """
+    one file per claimed slot in a directory shared by the nodes,
+    exclusive creation of the file decides the winner
+    """
+
+    def __init__(self, path: str = 'async_cron_lock', ttl: float = 86400,
+                 purge_interval: float = None):
+        super().__init__(ttl, purge_interval)
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def slot_file(self, name: str = None, fire: int = None):
+        return os.path.join(self.path,
+                            f"{urllib.parse.quote(name, safe='')}@{fire}")
+
+    def claim(self, slots=None, node: str = None, now: float = None):
+        self.purge(now)
+        won = set()
+        for slot in slots:
+            try:
+                fd = os.open(self.slot_file(*slot),
+                             os.O_WRONLY | os.O_CREAT | os.O_EXCL)
+            except FileExistsError:
+                # claimed by node itself in a retried claim
+                if self.owner(*slot) == node:
+                    won.add(slot)
+                continue
+            with os.fdopen(fd, 'w') as f:
+                f.write(node)
+            won.add(slot)
+        return won
+
+    def owner(self, name: str = None, fire: int = None):
+        """
+        :return: node claiming the slot, None if it can not be read
+        """
+        try:
+            with open(self.slot_file(name, fire)) as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def purge(self, now: float = None):
+        """
+        delete expired claims, at most once per purge_interval
+        """
+        expire = self.expiry(now)
+        if expire is None:
+            return
+        for file_name in os.listdir(self.path):
+            fire = file_name.rpartition('@')[2]
+            if fire.isdigit() and int(fire) < expire:
+                try:
+                    os.remove(os.path.join(self.path, file_name))
+                except FileNotFoundError:
+                    pass
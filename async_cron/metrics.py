@@ -0,0 +1,251 @@
+import asyncio
+import bisect
+import logging
+
+logger = logging.getLogger(__package__)
+
+# upper bounds of histogram buckets, seconds
+BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 60, float('inf'))
+
+COUNTER = 'counter'
+GAUGE = 'gauge'
+HISTOGRAM = 'histogram'
+
+
+class Counter:
+    __slots__ = ('value', )
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: float = 1):
+        self.value += amount
+
+
+class Histogram:
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value: float = None):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """
+    counters and histograms keyed by metric name and labels.
+    recording is a dict lookup and an addition, exporting
+    does all the formatting
+    """
+
+    def __init__(self, buckets=BUCKETS):
+        """
+        :param buckets: histogram bucket upper bounds, ending with inf
+        """
+        self.buckets = buckets
+        # name -> (kind, help)
+        self.meta = {}
+        # name -> {labels: Counter or Histogram}
+        self.metrics = {}
+        # name -> {labels: callable returning the current value}
+        self.gauges = {}
+
+    def describe(self, name: str = None, kind: str = None, help: str = ''):
+        self.meta.setdefault(name, (kind, help))
+
+    def counter(self, name: str = None, labels: tuple = ()):
+        """
+        :param labels: tuple of (label, value)
+        """
+        metrics = self.metrics.setdefault(name, {})
+        metric = metrics.get(labels)
+        if metric is None:
+            self.describe(name, COUNTER)
+            metric = metrics[labels] = Counter()
+        return metric
+
+    def histogram(self, name: str = None, labels: tuple = ()):
+        metrics = self.metrics.setdefault(name, {})
+        metric = metrics.get(labels)
+        if metric is None:
+            self.describe(name, HISTOGRAM)
+            metric = metrics[labels] = Histogram(self.buckets)
+        return metric
+
+    def gauge(self, name: str = None, func=None, labels: tuple = (),
+              help: str = ''):
+        """
+        register a gauge read when exported
+        :param func: callable returning the current value
+        """
+        self.describe(name, GAUGE, help)
+        self.gauges.setdefault(name, {})[labels] = func
+
+    def remove(self, labels: tuple = ()):
+        """
+        drop the metrics of labels, such as the ones of a deleted job
+        """
+        for metrics in self.metrics.values():
+            metrics.pop(labels, None)
+
+    def collect(self):
+        """
+        :return: list of (name, kind, help, {labels: value}), value is
+        :       a number, or the Histogram itself
+        """
+        result = []
+        for name, (kind, help) in self.meta.items():
+            if kind == GAUGE:
+                values = {
+                    labels: func()
+                    for labels, func in self.gauges.get(name, {}).items()
+                }
+            elif kind == COUNTER:
+                values = {
+                    labels: metric.value
+                    for labels, metric in self.metrics.get(name, {}).items()
+                }
+            else:
+                values = dict(self.metrics.get(name, {}))
+            result.append((name, kind, help, values))
+        return result
+
+
+def escape(value=None):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace(
+        '\n', '\\n')
+
+
+def format_labels(labels: tuple = (), extra: tuple = ()):
+    labels = labels + extra
+    if not labels:
+        return ''
+    items = ','.join(f'{key}="{escape(value)}"' for key, value in labels)
+    return '{' + items + '}'
+
+
+def format_value(value: float = None):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def prometheus_text(registry: MetricsRegistry = None):
+    """
+    :return: registry in prometheus text exposition format
+    """
+    lines = []
+    for name, kind, help, values in registry.collect():
+        if help:
+            lines.append(f'# HELP {name} {help}')
+        lines.append(f'# TYPE {name} {kind}')
+        for labels, value in values.items():
+            if kind != HISTOGRAM:
+                lines.append(
+                    f'{name}{format_labels(labels)} {format_value(value)}')
+                continue
+            cumulative = 0
+            for bound, count in zip(value.buckets, value.counts):
+                cumulative += count
+                bucket_labels = format_labels(labels,
+                                              (('le', format_value(bound)), ))
+                lines.append(f'{name}_bucket{bucket_labels} {cumulative}')
+            lines.append(f'{name}_sum{format_labels(labels)} '
+                         f'{format_value(value.sum)}')
+            lines.append(f'{name}_count{format_labels(labels)} {value.count}')
+    return '\n'.join(lines) + '\n'
+
+
+class Exporter:
+    """
+    publishes a registry, runs on the scheduler event loop
+    """
+
+    def __init__(self, registry: MetricsRegistry = None):
+        self.registry = registry
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+
+class PrometheusExporter(Exporter):
+    """
+    serve the registry in prometheus text format over http
+    """
+
+    def __init__(self, registry: MetricsRegistry = None, host: str = '0.0.0.0',
+                 port: int = 9100, path: str = '/metrics'):
+        super().__init__(registry)
+        self.host = host
+        self.port = port
+        self.path = path
+        self.server = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle, self.host,
+                                                 self.port)
+        if not self.port:
+            self.port = self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+
+    async def handle(self, reader=None, writer=None):
+        try:
+            request = await reader.readline()
+            while (await reader.readline()).strip():
+                pass
+            parts = request.decode('latin-1').split()
+            if len(parts) >= 2 and parts[1].split('?')[0] == self.path:
+                status = '200 OK'
+                body = prometheus_text(self.registry).encode()
+            else:
+                status = '404 Not Found'
+                body = b'not found\n'
+            writer.write(
+                f'HTTP/1.0 {status}\r\n'
+                'Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n'
+                f'Content-Length: {len(body)}\r\n\r\n'.encode() + body)
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+class LogExporter(Exporter):
+    """
+    log the registry in prometheus text format every interval seconds
+    """
+
+    def __init__(self, registry: MetricsRegistry = None, interval: float = 60,
+                 level: int = logging.INFO):
+        super().__init__(registry)
+        self.interval = interval
+        self.level = level
+        self.task = None
+
+    async def start(self):
+        self.task = asyncio.ensure_future(self.log_loop())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+
+    async def log_loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            logger.log(self.level, prometheus_text(self.registry))
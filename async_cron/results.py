@@ -0,0 +1,66 @@
+import asyncio
+import collections
+
+# outcome of one run, exception is None if it succeeded,
+# fire_time is the scheduled time as epoch seconds
+Outcome = collections.namedtuple(
+    'Outcome', ('job_name', 'fire_time', 'result', 'exception', 'duration'))
+
+
+class ResultStream:
+    """
+    bounded buffer of run outcomes, consumed in batches:
+    async for outcomes in msh.subscribe(): ...
+    putting never blocks, when the buffer is full the oldest outcome
+    is dropped and counted in dropped
+    """
+
+    def __init__(self, maxsize: int = 1000, batch_size: int = 100):
+        """
+        :param maxsize: max number of buffered outcomes
+        :param batch_size: max number of outcomes of one batch
+        """
+        self.buffer = collections.deque(maxlen=maxsize)
+        self.batch_size = batch_size
+        self.dropped = 0
+        self.closed = False
+        self._ready = asyncio.Event()
+
+    def put(self, outcome: Outcome = None):
+        if self.closed:
+            return
+        if len(self.buffer) == self.buffer.maxlen:
+            self.dropped += 1
+        self.buffer.append(outcome)
+        self._ready.set()
+
+    async def get_batch(self):
+        """
+        wait for outcomes and take up to batch_size of them
+        :return: list of Outcome, empty once the stream is closed and drained
+        """
+        while not self.buffer:
+            if self.closed:
+                return []
+            self._ready.clear()
+            await self._ready.wait()
+        buffer = self.buffer
+        return [
+            buffer.popleft() for _ in range(min(self.batch_size, len(buffer)))
+        ]
+
+    def close(self):
+        """
+        stop accepting outcomes, consumers end after the buffered ones
+        """
+        self.closed = True
+        self._ready.set()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        batch = await self.get_batch()
+        if not batch:
+            raise StopAsyncIteration
+        return batch
@@ -0,0 +1,41 @@
+import random
+
+
+class Retry:
+    """
+    retry policy of failed runs: exponential backoff with jitter.
+    the n-th retry waits delay * backoff ** (n - 1), at most max_delay,
+    scaled by a random factor in [1 - jitter, 1 + jitter] so jobs failing
+    together do not retry on the same second
+    """
+
+    def __init__(self, attempts: int = 3, delay: float = 1,
+                 backoff: float = 2, max_delay: float = 300,
+                 jitter: float = 0.5):
+        """
+        :param attempts: max retries after a failed run
+        :param delay: seconds before the first retry
+        :param backoff: multiplier of the delay for every further retry
+        :param max_delay: max seconds before a retry, before jitter
+        :param jitter: relative random spread of the delay, 0 to 1
+        """
+        self.attempts = attempts
+        self.delay = delay
+        self.backoff = backoff
+        self.max_delay = max_delay
+        self.jitter = jitter
+
+    def __repr__(self):
+        return (f'Retry(attempts={self.attempts}, delay={self.delay}, '
+                f'backoff={self.backoff}, max_delay={self.max_delay}, '
+                f'jitter={self.jitter})')
+
+    def delay_of(self, attempt: int = 1):
+        """
+        :param attempt: number of the retry, from 1
+        :return: seconds to wait before it
+        """
+        delay = min(self.delay * self.backoff**(attempt - 1), self.max_delay)
+        if self.jitter:
+            delay *= random.uniform(1 - self.jitter, 1 + self.jitter)
+        return delay
@@ -1,60 +1,1063 @@
 import asyncio
-from .job import CronJob
+import functools
+import heapq
+import itertools
+import random
+import time
+import uuid
+import zlib
+from .job import CronJob, NOT_RUN, close_coroutines
+from .executors import create_executor, INLINE, THREAD, PROCESS
+from .clock import SYSTEM_CLOCK
+from .wheel import TimingWheel
+from .dispatch import Dispatcher
+from .results import Outcome, ResultStream
+from .events import (EventLog, ADDED, FIRED, FINISHED, FAILED, SKIPPED,
+                     REMOVED, RETRY)
 import logging
 
 logger = logging.getLogger(__package__)
 
+# check every job each check_interval
+POLL = 'poll'
+# keep jobs in a min-heap keyed by their next wakeup time
+HEAP = 'heap'
+# keep jobs in a timing wheel of second, minute and hour slots
+WHEEL = 'wheel'
+
+
+def spread_offset(job_name: str = None, spread: float = None):
+    """
+    offset of a job in [0, spread) seconds, stable across processes
+    and restarts
+    """
+    return zlib.crc32(job_name.encode()) / 2 ** 32 * spread
+
+
+def by_priority(job: CronJob = None):
+    """
+    sort key of due jobs, higher priorities first
+    """
+    return -job.priority
+
 
 class Scheduler:
     def __init__(self, name=None, check_interval: int = 5,
-                 loop=None, log_level=None, locale=None):
+                 loop=None, log_level=None, locale=None, mode: str = POLL,
+                 max_concurrency: int = None, max_pending: int = None,
+                 executor: str = None, state_store=None,
+                 flush_interval: float = 1, run_lock=None,
+                 node: str = None, metrics=None, events=None, clock=None,
+                 retry=None, spread: float = None, jitter: float = None,
+                 max_fires: int = None, groups: dict = None):
         """
         :param name:name of the scheduler
         :param check_interval: check interval of the scheduler, unit is second
-        :param locale: locale for humanized time,follows the general rule of locale
+        :param locale: locale for humanized time,follows the general rule of locale,
+        :       only formatted when the fired event is written
+        :param mode: POLL checks every job each check_interval,
+        :       HEAP sleeps until the earliest job is due and only checks
+        :       due jobs, idle cost does not grow with the number of jobs
+        :       WHEEL checks every check_interval, which may be below a
+        :       second, but only the jobs of the seconds passed since
+        :       the last tick
+        :param max_concurrency: max number of coroutine runs executing at once,
+        :       further runs wait for a free slot, shared by the job groups
+        :param max_pending: max number of runs waiting for a slot,
+        :       runs beyond it are skipped
+        :param executor: name of the executor running sync jobs,
+        :       THREAD, PROCESS or one added by add_executor,
+        :       default to run them inline on the event loop
+        :param state_store: async_cron.store.StateStore keeping last_run,
+        :       next_run and run_count of jobs across restarts.
+        :       states are read once at start and written in batches
+        :param flush_interval: seconds between two state writes
+        :param run_lock: async_cron.lock.RunLock shared with other nodes
+        :       running the same jobs, every due run is claimed first and
+        :       only runs on the node winning it. claims of one tick are
+        :       sent in one batch
+        :param node: id of this node in run_lock, default to a random id
+        :param metrics: async_cron.metrics.MetricsRegistry recording tick
+        :       duration, firing lag, run duration, runs and failures
+        :param events: async_cron.events.EventLog of job lifecycle events,
+        :       default to the async_cron.events logger
+        :param clock: async_cron.clock.Clock giving the time to the scheduler
+        :       and its jobs, SimulatedClock replays schedules without waiting
+        :param retry: async_cron.retry.Retry of failed runs of jobs
+        :       without their own, default to no retry
+        :param spread: seconds, jobs without their own spread fire at
+        :       a stable offset below it derived from their name
+        :param jitter: seconds, jobs without their own jitter fire at
+        :       a random offset below it, drawn for every fire
+        :param max_fires: max number of runs started in one tick, further
+        :       due runs are deferred to the next ticks, oldest first.
+        :       HEAP counts the due jobs checked instead of the runs
+        :       and waits check_interval before the deferred ones
+        :param groups: group name -> weight of its share of max_concurrency
+        :       while runs wait for a slot, groups not listed weigh 1
         """
         self.name = name
         self.check_interval = check_interval
         self.loop = loop or asyncio.get_event_loop()
         self.jobs = {}
         self.locale = locale or "zh_CN"
+        if mode not in (POLL, HEAP, WHEEL):
+            raise ValueError(f"unknown scheduler mode: {mode}")
+        self.mode = mode
+        # heap entries are [fire_timestamp, seq, job_name, valid]
+        self._heap = []
+        self._heap_entries = {}
+        self._heap_seq = itertools.count()
+        self._wakeup = asyncio.Event()
+        self.max_concurrency = max_concurrency
+        self.max_pending = max_pending
+        self.clock = clock or SYSTEM_CLOCK
+        self.groups = groups or {}
+        self._dispatcher = None
+        if max_concurrency:
+            self._dispatcher = Dispatcher(max_concurrency, self.groups,
+                                          self.clock.time)
+        # active tasks of all jobs
+        self.tasks = set()
+        self.executor = executor
+        self.executors = {}
+        self.state_store = state_store
+        self.flush_interval = flush_interval
+        # job name -> state, None until load_state
+        self.states = None
+        # job name -> job, runs not written to state_store yet
+        self._dirty = {}
+        # names of the removed jobs, states not deleted from state_store yet
+        self._deleted = set()
+        self._store_executor = None
+        self.run_lock = run_lock
+        self.node = node or uuid.uuid4().hex
+        self.metrics = metrics
+        self.events = events or EventLog()
+        self._wheel = None
+        if mode == WHEEL:
+            self._wheel = TimingWheel(self.clock.time())
+        # ResultStream of every subscriber
+        self.streams = []
+        self.retry = retry
+        # retries waiting, heap of (timestamp, seq, job_name)
+        self._retries = []
+        # job name -> consecutive failed runs
+        self._failures = {}
+        self.spread = spread
+        self.jitter = jitter
+        # job name -> seconds its next fire is delayed, delayed jobs only
+        self._delays = {}
+        self.max_fires = max_fires
+        # names of the due jobs deferred by max_fires, run first next tick
+        self._deferred = []
+        # runs were deferred, HEAP waits check_interval for the next tick
+        self._capped = False
+        # jobs with a priority, due jobs are only sorted when there are some
+        self._priorities = 0
+        # groups whose metrics are registered
+        self._metric_groups = set()
+        self.metric_labels = (('scheduler', name or 'default'), )
+        if metrics is not None:
+            self.register_metrics()
 
     async def start(self):
-        while True:
+        flusher = None
+        if self.state_store is not None:
+            await self.load_state()
+            flusher = self.loop.create_task(self.flush_state_loop())
+        try:
+            await self.tick_loop()
+        finally:
+            if flusher is not None:
+                flusher.cancel()
+                await self.flush_state()
+            for stream in self.streams:
+                stream.close()
+
+    async def tick_loop(self):
+        while not self.clock.expired():
             try:
-                await self.check_jobs()
-                await asyncio.sleep(self.check_interval)
+                started = time.perf_counter()
+                if self.mode == HEAP:
+                    await self.run_due_jobs()
+                    self.observe_tick(started)
+                    await self.wait_next_due()
+                elif self.mode == WHEEL:
+                    await self.run_due_jobs()
+                    self.observe_tick(started)
+                    await self.clock.sleep(self.check_interval)
+                else:
+                    await self.check_jobs()
+                    self.observe_tick(started)
+                    await self.clock.sleep(self.check_interval)
             except KeyboardInterrupt:
                 logger.info('keyboard interrupt,exit')
                 break
             except Exception as tmp:
+                # failed runs are handled per job, this is a scheduler error
                 logger.exception(tmp)
-                logger.info('error occurs,exit')
-                break
+                logger.info('error occurs,continue')
+                await self.clock.sleep(self.check_interval)
 
     def add_job(self, job: CronJob = None):
         if job.name in self.jobs:
             if self.jobs[job.name] == job:
                 pass
         else:
+            if self.restore_job(job) and job.remove():
+                self.events.emit(SKIPPED, job.name, reason='out of date')
+                return
             self.jobs[job.name] = job
+            job.scheduler = self
+            self.draw_delay(job)
+            if job.priority:
+                self._priorities += 1
+            self.anchor_job(job)
+            if self.mode == POLL:
+                job.refresh_next_fire(self.job_time(job))
+            else:
+                self.push_job(job)
+            self.events.emit(ADDED, job.name)
 
-    def del_job(self, job_name: str = None):
+    def add_jobs(self, jobs=None):
+        """
+        add many jobs in one pass, the heap is rebuilt once
+        and the first fire times share one clock reading
+        :param jobs: iterable of jobs, names already added are ignored
+        :return: list of the added jobs
+        """
+        added = []
+        for job in jobs:
+            if job.name in self.jobs:
+                continue
+            if self.restore_job(job) and job.remove():
+                self.events.emit(SKIPPED, job.name, reason='out of date')
+                continue
+            self.jobs[job.name] = job
+            job.scheduler = self
+            self.draw_delay(job)
+            if job.priority:
+                self._priorities += 1
+            added.append(job)
+        timestamp = self.clock.time()
+        if self.run_lock is not None:
+            for job in added:
+                self.anchor_job(job, timestamp)
+        if self.mode == HEAP:
+            heap = self._heap
+            for job in added:
+                fire = job.refresh_next_fire(self.job_time(job, timestamp))
+                if fire is None:
+                    continue
+                fire += self.delay_of(job)
+                entry = [fire, next(self._heap_seq), job.name, True]
+                self._heap_entries[job.name] = entry
+                heap.append(entry)
+            heapq.heapify(heap)
+            self._wakeup.set()
+        elif self.mode == WHEEL:
+            wheel = self._wheel
+            for job in added:
+                fire = job.refresh_next_fire(self.job_time(job, timestamp))
+                if fire is not None:
+                    wheel.add(job.name, fire + self.delay_of(job))
+        else:
+            for job in added:
+                job.refresh_next_fire(self.job_time(job, timestamp))
+        if self.events.enabled(ADDED):
+            for job in added:
+                self.events.emit(ADDED, job.name)
+        return added
+
+    def remove_jobs(self, job_names=None, reason: str = None):
+        """
+        delete many jobs in one pass, names not in jobs are ignored
+        :param reason: why the jobs are deleted, written in removed events
+        :return: list of the deleted job names
+        """
+        removed = [name for name in job_names if name in self.jobs]
+        for name in removed:
+            if self.jobs.pop(name).priority:
+                self._priorities -= 1
+            if self.mode == HEAP:
+                entry = self._heap_entries.pop(name, None)
+                if entry is not None:
+                    entry[-1] = False
+            elif self.mode == WHEEL:
+                self._wheel.discard(name)
+            self._delays.pop(name, None)
+            self.forget_state(name, reason)
+            if self.metrics is not None:
+                self.metrics.remove(self.job_labels(name))
+            self.events.emit(REMOVED, name, reason=reason)
+        if self.mode == HEAP and removed:
+            # drop the invalidated entries once they are most of the heap
+            if len(self._heap) > 2 * len(self._heap_entries):
+                self._heap = [i for i in self._heap if i[-1]]
+                heapq.heapify(self._heap)
+            self._wakeup.set()
+        return removed
+
+    def del_job(self, job_name: str = None, reason: str = None):
+        """
+        :param reason: why the job is deleted, written in the removed event
+        """
         if job_name in self.jobs:
-            del self.jobs[job_name]
+            if self.jobs.pop(job_name).priority:
+                self._priorities -= 1
+            if self.mode != POLL:
+                self.pop_job(job_name)
+            self._delays.pop(job_name, None)
+            self.forget_state(job_name, reason)
+            if self.metrics is not None:
+                self.metrics.remove(self.job_labels(job_name))
+            self.events.emit(REMOVED, job_name, reason=reason)
         else:
             logger.info(f'{job_name} is in scheduler jobs list')
 
-    async def check_jobs(self):
-        remove_list = []
+    def restore_job(self, job: CronJob = None):
+        """
+        apply the stored state of job, once. a job added again later
+        keeps the state it was given
+        :return: True if a state was found
+        """
+        if not self.states or job.name not in self.states:
+            return False
+        job.set_state(self.states.pop(job.name))
+        return True
+
+    def forget_state(self, job_name: str = None, reason: str = None):
+        """
+        delete the stored state of a removed job at the next flush.
+        jobs out of date keep it, so a restart does not run them again
+        """
+        if self.state_store is None or reason == 'out of date':
+            return
+        self._dirty.pop(job_name, None)
+        self._deleted.add(job_name)
+
+    async def run_store(self, func=None, *args):
+        """
+        call a blocking state_store method in its own worker thread
+        """
+        if self._store_executor is None:
+            self._store_executor = create_executor(THREAD, 1)
+        return await self.loop.run_in_executor(self._store_executor, func,
+                                               *args)
+
+    def anchor_job(self, job: CronJob = None, timestamp: float = None):
+        """
+        with a run_lock, an interval job without next_run starts on the
+        epoch grid of its interval instead of now, so every node computes
+        the same fire times and claim slots
+        :param timestamp: epoch seconds, default to the clock time
+        """
+        if self.run_lock is None or job.next_run is not None:
+            return
+        fire = job.epoch_fire(self.job_time(job, timestamp))
+        if fire is not None:
+            job.next_run = fire
+
+    @staticmethod
+    def fire_timestamp(job: CronJob = None):
+        """
+        :return: scheduled time of the next run of job as epoch seconds
+        """
+        return job.next_fire
+
+    def fire_slot(self, job: CronJob = None):
+        """
+        :return: (job name, fire timestamp), same on every node
+        """
+        return job.name, int(self.fire_timestamp(job))
+
+    async def claim_runs(self, jobs=None):
+        """
+        claim the due runs of jobs in one batch
+        :return: set of names of the jobs won by this node,
+        :       None if the claim failed
+        """
+        slots = [self.fire_slot(job) for job in jobs]
+        try:
+            won = await self.run_store(self.run_lock.claim, slots, self.node,
+                                       self.clock.time())
+        except Exception as tmp:
+            logger.exception(tmp)
+            logger.info('claim runs error')
+            return None
+        return {name for name, _ in won}
+
+    async def load_state(self):
+        """
+        read all states at once and apply them to the current jobs
+        """
+        self.states = await self.run_store(self.state_store.load)
+        for job in list(self.jobs.values()):
+            if not self.restore_job(job):
+                continue
+            if job.remove():
+                self.del_job(job.name, reason='out of date')
+            elif self.mode != POLL:
+                self.push_job(job)
+            else:
+                job.refresh_next_fire(self.job_time(job))
+
+    async def flush_state(self):
+        """
+        write the states of the jobs run since the last flush,
+        and delete the states of the jobs removed since then
+        """
+        if self._deleted:
+            deleted, self._deleted = self._deleted, set()
+            # a job added again, e.g. replaced by a reload, keeps a state
+            for name in deleted:
+                if name in self.jobs:
+                    self._dirty.setdefault(name, self.jobs[name])
+            deleted = [name for name in deleted if name not in self.jobs]
+            if deleted:
+                await self.run_store(self.state_store.delete, deleted)
+        if not self._dirty:
+            return
+        dirty, self._dirty = self._dirty, {}
+        states = {name: job.get_state() for name, job in dirty.items()}
+        await self.run_store(self.state_store.save, states)
+
+    async def flush_state_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush_state()
+            except Exception as tmp:
+                logger.exception(tmp)
+                logger.info('flush state error')
+
+    def add_executor(self, name: str = None, executor=None):
+        """
+        register an executor jobs can choose by name
+        :param executor: concurrent.futures.Executor
+        """
+        self.executors[name] = executor
+
+    def get_executor(self, name: str = None):
+        """
+        :param name: executor name, default to the scheduler executor
+        :return: executor, None to run inline
+        """
+        name = name or self.executor
+        if not name or name == INLINE:
+            return None
+        executor = self.executors.get(name)
+        if executor is None:
+            if name not in (THREAD, PROCESS):
+                raise ValueError(f"unknown executor: {name}")
+            executor = self.executors[name] = create_executor(name)
+        return executor
+
+    def shutdown(self, wait: bool = True):
+        """
+        shutdown all executors
+        """
+        for executor in self.executors.values():
+            executor.shutdown(wait=wait)
+        self.executors.clear()
+        if self._store_executor is not None:
+            self._store_executor.shutdown(wait=wait)
+            self._store_executor = None
+
+    def accept_run(self, job: CronJob = None):
+        """
+        backpressure, refuse new runs while too many runs wait for a slot
+        """
+        if self.max_concurrency and self.max_pending is not None:
+            pending = len(self.tasks) - self.max_concurrency
+            if pending >= self.max_pending:
+                logger.info(f'{job.name} skipped, {pending} runs pending')
+                return False
+        return True
+
+    def spawn(self, job: CronJob = None, coro=None, wrap=None):
+        """
+        start a coroutine of job as a task tracked by the scheduler
+        :param wrap: callable wrapping the coroutine before it waits for
+        :       a dispatcher slot, the max_instances limit of job, so a run
+        :       waiting for its own job does not hold a slot
+        """
+        inner = []
+        if self._dispatcher is not None:
+            inner.append(coro)
+            coro = self.limit(job, coro)
+        if wrap is not None:
+            inner.append(coro)
+            coro = wrap(coro)
+        task = self.loop.create_task(coro)
+        if inner:
+            task.add_done_callback(functools.partial(close_coroutines,
+                                                     inner))
+        self.tasks.add(task)
+        started = fire = None
+        if self.timed():
+            started = time.perf_counter()
+            fire = self.fire_timestamp(job)
+        task.add_done_callback(
+            functools.partial(self.task_done, job.name, started=started,
+                              fire=fire))
+        return task
+
+    async def limit(self, job: CronJob = None, coro=None):
+        """
+        run coro once the dispatcher gives a slot to the group of job
+        """
+        group = job.group
+        if self.metrics is not None and group not in self._metric_groups:
+            self.register_group(group)
+        await self._dispatcher.acquire(group, job.priority)
+        try:
+            return await coro
+        finally:
+            self._dispatcher.release(group)
+
+    def task_done(self, job_name: str = None, task=None,
+                  started: float = None, fire: float = None):
+        """
+        :param started: perf_counter at spawn, when runs are timed
+        :param fire: scheduled time of the run, when runs are timed
+        """
+        self.tasks.discard(task)
+        if task.cancelled():
+            return
+        exception = task.exception()
+        if started is not None:
+            result = None if exception is not None else task.result()
+            self.observe_run(job_name, started, exception, result, fire)
+        elif exception is not None:
+            self.events.emit(FAILED, job_name, error=exception,
+                             exc_info=exception)
+        if exception is not None:
+            self.retry_later(job_name)
+        elif self._failures:
+            self._failures.pop(job_name, None)
+
+    def invoke(self, job: CronJob = None, func=None, *args, fire=None):
+        """
+        call func of job, a failure is recorded and retried, never raised
+        :param fire: scheduled time of the run
+        :return: result of func, None if it failed or started no run
+        """
+        started = time.perf_counter() if self.timed() else None
+        try:
+            result = func(*args)
+        except Exception as tmp:
+            if started is not None:
+                self.observe_run(job.name, started, tmp, fire=fire)
+            else:
+                self.events.emit(FAILED, job.name, error=tmp, exc_info=tmp)
+            self.retry_later(job.name)
+            return None
+        if result is NOT_RUN:
+            # refused or dropped, there is no outcome to record
+            self.events.emit(SKIPPED, job.name, reason='not started')
+            return None
+        # spawned runs are observed when their task is done
+        if not isinstance(result, asyncio.Future):
+            if started is not None:
+                self.observe_run(job.name, started, result=result, fire=fire)
+            if self._failures:
+                self._failures.pop(job.name, None)
+        return result
+
+    def retry_later(self, job_name: str = None):
+        """
+        schedule a retry of a failed run of job, following its retry policy
+        """
+        job = self.jobs.get(job_name)
+        policy = None if job is None else job.retry or self.retry
+        if policy is None:
+            return
+        attempt = self._failures.get(job_name, 0) + 1
+        if attempt > policy.attempts:
+            self._failures.pop(job_name, None)
+            logger.info(f'{job_name} failed after {policy.attempts} retries')
+            return
+        self._failures[job_name] = attempt
+        delay = policy.delay_of(attempt)
+        heapq.heappush(self._retries, (self.clock.time() + delay,
+                                       next(self._heap_seq), job_name))
+        self._wakeup.set()
+        self.events.emit(RETRY, job_name, attempt=attempt, delay=delay)
+
+    def run_retries(self, timestamp: float = None):
+        """
+        call the jobs whose retry is due, without changing their schedule
+        """
+        retries = self._retries
+        while retries and retries[0][0] <= timestamp:
+            _, _, job_name = heapq.heappop(retries)
+            job = self.jobs.get(job_name)
+            if job is None:
+                self._failures.pop(job_name, None)
+                continue
+            self.events.emit(FIRED, job_name,
+                             attempt=self._failures.get(job_name))
+            self.invoke(job, self.retry_run, job)
+
+    def retry_run(self, job: CronJob = None):
+        """
+        call job again, its max_instances, overlap policy and the scheduler
+        limits apply as to a scheduled run
+        :return: result of the run, NOT_RUN if it was refused
+        """
+        if not job.accept_run():
+            return NOT_RUN
+        return job.call()
+
+    def register_metrics(self):
+        metrics = self.metrics
+        metrics.describe('async_cron_tick_seconds', 'histogram',
+                         'duration of a scheduler tick')
+        metrics.describe('async_cron_fire_lag_seconds', 'histogram',
+                         'delay between scheduled and actual fire time')
+        metrics.describe('async_cron_run_seconds', 'histogram',
+                         'duration of a job run')
+        metrics.describe('async_cron_runs_total', 'counter', 'job runs')
+        metrics.describe('async_cron_failures_total', 'counter',
+                         'failed job runs')
+        metrics.gauge('async_cron_jobs', lambda: len(self.jobs),
+                      self.metric_labels, 'scheduled jobs')
+        metrics.gauge('async_cron_tasks_in_flight', lambda: len(self.tasks),
+                      self.metric_labels, 'running job tasks')
+
+    def register_group(self, group: str = None):
+        self._metric_groups.add(group)
+        labels = self.metric_labels + (('group', group), )
+        dispatcher = self._dispatcher
+        self.metrics.gauge('async_cron_group_queued',
+                           functools.partial(dispatcher.queued, group),
+                           labels, 'runs of a group waiting for a slot')
+        self.metrics.gauge('async_cron_group_lag_seconds',
+                           functools.partial(dispatcher.lag, group), labels,
+                           'wait of the oldest run of a group')
+
+    def job_labels(self, job_name: str = None):
+        return self.metric_labels + (('job', job_name), )
+
+    def observe_tick(self, started: float = None):
+        if self.metrics is not None:
+            self.metrics.histogram('async_cron_tick_seconds',
+                                   self.metric_labels).observe(
+                                       time.perf_counter() - started)
+
+    def observe_fire(self, job: CronJob = None, now=None):
+        fire = self.fire_timestamp(job)
+        labels = self.job_labels(job.name)
+        self.metrics.counter('async_cron_runs_total', labels).inc()
+        if fire is not None:
+            self.metrics.histogram('async_cron_fire_lag_seconds',
+                                   labels).observe(
+                                       max(now - fire, 0))
+
+    def subscribe(self, maxsize: int = 1000, batch_size: int = 100):
+        """
+        stream of the outcomes of the runs from now on:
+        async for outcomes in msh.subscribe(): ...
+        :param maxsize: outcomes buffered for this subscriber, the oldest
+        :       are dropped when it falls behind
+        :param batch_size: max outcomes delivered at once
+        :return: async_cron.results.ResultStream
+        """
+        stream = ResultStream(maxsize, batch_size)
+        self.streams.append(stream)
+        return stream
+
+    def unsubscribe(self, stream: ResultStream = None):
+        if stream in self.streams:
+            self.streams.remove(stream)
+        stream.close()
+
+    def timed(self):
+        """
+        :return: True if runs are timed, for metrics, events or subscribers
+        """
+        return (self.metrics is not None or bool(self.streams)
+                or self.events.enabled(FINISHED))
+
+    def observe_run(self, job_name: str = None, started: float = None,
+                    exception: BaseException = None, result=None,
+                    fire: float = None):
+        """
+        record a timed run in metrics, events and result streams
+        :param exception: exception of a failed run
+        :param result: return value of a successful run
+        :param fire: scheduled time of the run
+        """
+        duration = time.perf_counter() - started
+        if self.streams:
+            outcome = Outcome(job_name, fire, result, exception, duration)
+            for stream in self.streams:
+                stream.put(outcome)
+        if self.metrics is not None:
+            labels = self.job_labels(job_name)
+            self.metrics.histogram('async_cron_run_seconds',
+                                   labels).observe(duration)
+            if exception is not None:
+                self.metrics.counter('async_cron_failures_total',
+                                     labels).inc()
+        if exception is not None:
+            self.events.emit(FAILED, job_name, duration=duration,
+                             error=exception, exc_info=exception)
+        else:
+            self.events.emit(FINISHED, job_name, duration=duration)
+
+    def stats(self):
+        """
+        :return: dict of job count, active task count and total runs
+        """
+        return {
+            'jobs': len(self.jobs),
+            'tasks': len(self.tasks),
+            'runs': sum(job.run_count for job in self.jobs.values()),
+        }
+
+    def group_stats(self):
+        """
+        :return: dict of group name -> dict of job count, runs executing,
+        :       runs waiting for a slot and seconds the oldest one waited
+        """
+        result = {}
+        for job in self.jobs.values():
+            group = result.get(job.group)
+            if group is None:
+                group = result[job.group] = {
+                    'jobs': 0, 'running': 0, 'queued': 0, 'lag': 0}
+            group['jobs'] += 1
+        dispatcher = self._dispatcher
+        if dispatcher is not None:
+            for name in set(dispatcher.active) | set(dispatcher.queues):
+                group = result.setdefault(name, {'jobs': 0})
+                group['running'] = dispatcher.active[name]
+                group['queued'] = dispatcher.queued(name)
+                group['lag'] = dispatcher.lag(name)
+        return result
+
+    async def join(self):
+        """
+        wait until all active tasks are done
+        """
+        while self.tasks:
+            await asyncio.wait(list(self.tasks))
+
+    def push_job(self, job: CronJob = None, floor: float = None, now=None):
+        """
+        (re)insert job into the heap or wheel at its next fire time
+        :param floor: fire timestamps not later than floor are moved
+        :       one second forward, so a job that did not run can not spin
+        :param now: current epoch seconds as seen by job, see job_time
+        """
+        self.pop_job(job.name)
+        delay = self.delay_of(job)
+        if delay and now is None:
+            now = self.job_time(job)
+        timestamp = job.refresh_next_fire(now)
+        if delay and timestamp is not None:
+            timestamp += delay
+        if self.mode == WHEEL:
+            # passed times are due at the next second of the wheel
+            if timestamp is not None:
+                self._wheel.add(job.name, timestamp)
+            return
+        if timestamp is None:
+            return
+        if floor is not None and timestamp <= floor:
+            timestamp = floor + 1
+        entry = [timestamp, next(self._heap_seq), job.name, True]
+        self._heap_entries[job.name] = entry
+        is_head = not self._heap or timestamp < self._heap[0][0]
+        heapq.heappush(self._heap, entry)
+        if is_head:
+            self._wakeup.set()
+
+    def pop_job(self, job_name: str = None):
+        if self.mode == WHEEL:
+            self._wheel.discard(job_name)
+            return
+        entry = self._heap_entries.pop(job_name, None)
+        if entry is not None:
+            entry[-1] = False
+            if self._heap and self._heap[0] is entry:
+                self._wakeup.set()
+
+    def next_due(self):
+        """
+        :return: timestamp of the earliest heap entry, None if heap is empty
+        """
+        heap = self._heap
+        while heap and not heap[0][-1]:
+            heapq.heappop(heap)
+        if heap:
+            return heap[0][0]
+        return None
+
+    def upcoming(self, count: int = 10):
+        """
+        next runs of all jobs, ordered by fire time
+        :return: list of (fire_time, job_name)
+        """
+        result = []
         for name, job in self.jobs.items():
-            if job.decide_run():
-                now = job.get_now()
-                logger.info(
-                    f'runing:{job.name}:{now.humanize(locale=self.locale)}')
-                job.run()
-                if job.remove():
-                    remove_list.append(name)
+            result.extend((fire, name) for fire in job.upcoming(count))
+        result.sort(key=lambda item: item[0])
+        return result[:count]
+
+    async def wait_next_due(self):
+        self._wakeup.clear()
+        due = self.next_due()
+        if self._retries and (due is None or self._retries[0][0] < due):
+            due = self._retries[0][0]
+        if self._capped:
+            self._capped = False
+            later = self.clock.time() + self.check_interval
+            due = later if due is None else max(due, later)
+        await self.clock.sleep_until(due, self._wakeup)
+
+    def pop_due(self, timestamp: float = None, limit: int = None):
+        """
+        :param limit: max number of jobs, the other due entries stay
+        :       in the heap for the next tick
+        :return: jobs of the heap entries due at timestamp
+        """
+        heap = self._heap
+        due_jobs = []
+        while heap and heap[0][0] <= timestamp:
+            if not heap[0][-1]:
+                heapq.heappop(heap)
+                continue
+            if len(due_jobs) == limit:
+                self._capped = True
+                logger.info(f'due jobs deferred, {limit} runs per tick')
+                break
+            entry = heapq.heappop(heap)
+            del self._heap_entries[entry[2]]
+            due_jobs.append(self.jobs[entry[2]])
+        return due_jobs
+
+    def tick_time(self, utcnow=None):
+        """
+        :param utcnow: arrow time or epoch seconds of this tick,
+        :       default to the clock time
+        :return: epoch seconds of this tick, shared by every job
+        """
+        if utcnow is None:
+            return self.clock.time()
+        if isinstance(utcnow, (int, float)):
+            return utcnow
+        return utcnow.timestamp()
+
+    def draw_delay(self, job: CronJob = None):
+        """
+        pick the delay of the next fire of job, its stable spread offset
+        plus a random part of its jitter
+        """
+        spread = self.spread if job.spread is None else job.spread
+        jitter = self.jitter if job.jitter is None else job.jitter
+        if not spread and not jitter:
+            if self._delays:
+                self._delays.pop(job.name, None)
+            return
+        delay = 0
+        if spread:
+            delay = spread_offset(job.name, spread)
+        if jitter:
+            delay += random.uniform(0, jitter)
+        self._delays[job.name] = delay
+
+    def delay_of(self, job: CronJob = None):
+        """
+        :return: seconds the next fire of job is delayed
+        """
+        if not self._delays:
+            return 0
+        return self._delays.get(job.name, 0)
+
+    def job_time(self, job: CronJob = None, timestamp: float = None):
+        """
+        time as seen by job, its delay earlier than timestamp,
+        so a delayed job is due its delay after its fire time
+        :param timestamp: epoch seconds, default to the clock time
+        """
+        if timestamp is None:
+            timestamp = self.clock.time()
+        if not self._delays:
+            return timestamp
+        return timestamp - self._delays.get(job.name, 0)
+
+    def is_due(self, job: CronJob = None, timestamp: float = None):
+        """
+        :return: True if job runs at timestamp, a failed check is logged
+        """
+        try:
+            return job.decide_run(self.job_time(job, timestamp))
+        except Exception as tmp:
+            logger.exception(f'{job.name} check error: {tmp!r}')
+            return False
+
+    def poll_due(self, timestamp: float = None):
+        """
+        :return: due jobs by priority, the ones deferred by the last tick
+        :       first among the same priority
+        """
+        jobs = self.jobs
+        deferred, self._deferred = self._deferred, []
+        due_jobs = [jobs[name] for name in deferred
+                    if name in jobs and self.is_due(jobs[name], timestamp)]
+        deferred = set(deferred)
+        due_jobs.extend(job for name, job in jobs.items()
+                        if name not in deferred
+                        and self.is_due(job, timestamp))
+        if self._priorities:
+            due_jobs.sort(key=by_priority)
+        return due_jobs
+
+    def limit_fires(self, due_jobs=None, timestamp: float = None):
+        """
+        keep the due jobs of the first max_fires runs for this tick,
+        the others are deferred to the next ticks
+        :param due_jobs: jobs due in POLL, jobs to check otherwise
+        :return: jobs to handle in this tick
+        """
+        kept = []
+        fires = 0
+        for job in due_jobs:
+            if fires == self.max_fires:
+                break
+            kept.append(job)
+            if self.mode == POLL or self.is_due(job, timestamp):
+                fires += 1
+        deferred = due_jobs[len(kept):]
+        if not deferred:
+            return kept
+        logger.info(f'{len(deferred)} due jobs deferred, '
+                    f'{self.max_fires} runs per tick')
+        if self.mode == POLL:
+            self._deferred = [job.name for job in deferred]
+        else:
+            self._capped = True
+            for job in deferred:
+                if self.jobs.get(job.name) is job:
+                    # still due, first of the next tick in HEAP,
+                    # at the next second in WHEEL
+                    self.push_job(job, now=self.job_time(job, timestamp))
+        return kept
+
+    async def run_due_jobs(self, utcnow=None):
+        """
+        :param utcnow: time of this tick, default to the clock time
+        """
+        timestamp = self.tick_time(utcnow)
+        if self._retries:
+            self.run_retries(timestamp)
+        if self.mode == WHEEL:
+            due_jobs = [self.jobs[name]
+                        for name in self._wheel.advance(timestamp)]
+        elif self._priorities:
+            # the jobs over max_fires are pushed back after sorting
+            due_jobs = self.pop_due(timestamp)
+        else:
+            due_jobs = self.pop_due(timestamp, self.max_fires)
+        if self._priorities:
+            due_jobs.sort(key=by_priority)
+        if self.max_fires is not None and len(due_jobs) > self.max_fires:
+            due_jobs = self.limit_fires(due_jobs, timestamp)
+        won = None
+        if self.run_lock is not None and due_jobs:
+            won = await self.claim_runs(
+                [job for job in due_jobs if self.is_due(job, timestamp)])
+        for job in due_jobs:
+            if self.jobs.get(job.name) is not job:
+                continue
+            now = self.job_time(job, timestamp)
+            try:
+                if job.decide_run(now):
+                    if self.run_lock is None:
+                        if self.run_job(job, now):
+                            continue
+                    elif won is not None and self.run_job(
+                            job, now, execute=job.name in won):
+                        continue
+                self.push_job(job, floor=timestamp, now=now)
+            except Exception as tmp:
+                logger.exception(f'{job.name} check error: {tmp!r}')
+
+    async def check_jobs(self, utcnow=None):
+        """
+        :param utcnow: time of this tick, default to the clock time
+        """
+        timestamp = self.tick_time(utcnow)
+        if self._retries:
+            self.run_retries(timestamp)
+        remove_list = []
+        if (self.run_lock is not None or self.max_fires is not None
+                or self._priorities):
+            due_jobs = self.poll_due(timestamp)
+            if self.max_fires is not None and len(due_jobs) > self.max_fires:
+                due_jobs = self.limit_fires(due_jobs, timestamp)
+            won = None
+            if self.run_lock is not None and due_jobs:
+                won = await self.claim_runs(due_jobs)
+                if won is None:
+                    due_jobs = []
+            for job in due_jobs:
+                if self.jobs.get(job.name) is not job:
+                    continue
+                try:
+                    if self.run_job(job, self.job_time(job, timestamp),
+                                    remove=False,
+                                    execute=won is None or job.name in won):
+                        remove_list.append(job.name)
+                except Exception as tmp:
+                    logger.exception(f'{job.name} check error: {tmp!r}')
+        else:
+            delays = self._delays
+            for name, job in self.jobs.items():
+                now = timestamp - delays.get(name, 0) if delays else timestamp
+                try:
+                    if job.decide_run(now):
+                        if self.run_job(job, now, remove=False):
+                            remove_list.append(name)
+                except Exception as tmp:
+                    logger.exception(f'{name} check error: {tmp!r}')
         for i in remove_list:
-            self.del_job(i)
-            logger.info(f'{i} is out of date ,delete')
+            self.del_job(i, reason='out of date')
+
+    def run_job(self, job: CronJob = None, now=None, remove: bool = True,
+                execute: bool = True):
+        """
+        run a due job
+        :param now: current epoch seconds as seen by job,
+        :       default to the clock time
+        :param remove: delete the job from scheduler if it is out of date
+        :param execute: False if another node claimed the run
+        :return: True if the job is out of date
+        """
+        if now is None:
+            now = self.clock.time()
+        events = self.events
+        if not execute:
+            events.emit(SKIPPED, job.name, reason='claimed by another node')
+            job.run(now, execute)
+        else:
+            if self.metrics is not None:
+                self.observe_fire(job, now)
+            fire = self.fire_timestamp(job)
+            if events.enabled(FIRED):
+                events.emit(FIRED, job.name, time=job.to_arrow(now), fire=fire,
+                            locale=self.locale)
+            self.invoke(job, job.run, now, fire=fire)
+        if self._delays:
+            self.draw_delay(job)
+        if self.state_store is not None:
+            self._dirty[job.name] = job
+        if job.remove():
+            if remove:
+                self.del_job(job.name, reason='out of date')
+            return True
+        return False
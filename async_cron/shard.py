@@ -0,0 +1,209 @@
+import asyncio
+import multiprocessing
+import os
+import pickle
+import queue
+import zlib
+from .schedule import Scheduler
+import logging
+
+logger = logging.getLogger(__package__)
+
+# commands sent from ShardedScheduler to its shard processes
+ADD = 'add'
+DELETE = 'delete'
+STATS = 'stats'
+STOP = 'stop'
+
+
+def shard_of(job_name: str = None, shards: int = 1):
+    """
+    shard index of a job, stable across processes and restarts
+    """
+    return zlib.crc32(job_name.encode()) % shards
+
+
+def run_shard(index, commands, results, scheduler_kwargs):
+    """
+    entry point of a shard process
+    """
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        loop.run_until_complete(
+            serve_shard(index, commands, results, scheduler_kwargs))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        loop.close()
+
+
+async def serve_shard(index, commands, results, scheduler_kwargs):
+    loop = asyncio.get_event_loop()
+    scheduler = Scheduler(loop=loop, **scheduler_kwargs)
+    runner = loop.create_task(scheduler.start())
+    while True:
+        command, data = await loop.run_in_executor(None, commands.get)
+        if command == ADD:
+            scheduler.add_jobs(pickle.loads(data))
+        elif command == DELETE:
+            scheduler.remove_jobs(data)
+        elif command == STATS:
+            results.put((data, index, scheduler.stats()))
+        elif command == STOP:
+            break
+    runner.cancel()
+    try:
+        await runner
+    except asyncio.CancelledError:
+        pass
+    await scheduler.join()
+    scheduler.shutdown()
+
+
+class ShardedScheduler:
+    """
+    spread jobs over processes, each running its own Scheduler.
+    jobs are routed by the hash of their name, so they must be picklable:
+    module level functions, FileJobLoader commands and SlimJob
+    registered callables work, lambdas and closures do not
+    """
+
+    def __init__(self, name=None, shards: int = None, mp_context=None,
+                 **kwargs):
+        """
+        :param name: name of the scheduler
+        :param shards: number of processes, default to the cpu count
+        :param mp_context: multiprocessing start method, such as spawn
+        :param kwargs: parameters of the Scheduler of every shard
+        """
+        self.name = name
+        self.shards = shards or os.cpu_count() or 1
+        self.context = multiprocessing.get_context(mp_context)
+        self.commands = [self.context.Queue() for _ in range(self.shards)]
+        self.results = self.context.Queue()
+        self.processes = []
+        self.scheduler_kwargs = kwargs
+        # job name -> job as it was last added, its state lives in the
+        # shard. a shard may have removed it since, e.g. after its run_total
+        self.jobs = {}
+        self._stats_id = 0
+
+    def launch(self):
+        """
+        start the shard processes
+        """
+        if self.processes:
+            return
+        for index, commands in enumerate(self.commands):
+            process = self.context.Process(
+                target=run_shard,
+                args=(index, commands, self.results, self.scheduler_kwargs),
+                name=f'{self.name or "async_cron"}-shard-{index}',
+                daemon=True)
+            process.start()
+            self.processes.append(process)
+
+    async def start(self):
+        """
+        start the shard processes and wait until they exit
+        """
+        self.launch()
+        loop = asyncio.get_event_loop()
+        try:
+            for process in self.processes:
+                await loop.run_in_executor(None, process.join)
+        finally:
+            self.stop()
+
+    def stop(self, timeout: float = 10):
+        for commands in self.commands:
+            commands.put((STOP, None))
+        for process in self.processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        self.processes = []
+
+    def add_job(self, job=None):
+        """
+        the shard ignores the job if it still runs one of the same name
+        """
+        # pickle now, so an unpicklable job fails here and not in the shard
+        data = pickle.dumps([job])
+        self.jobs[job.name] = job
+        self.commands[shard_of(job.name, self.shards)].put((ADD, data))
+
+    def add_jobs(self, jobs=None):
+        """
+        add many jobs, one message per shard. a shard ignores the jobs
+        whose name it still runs, only it knows the removed ones
+        :return: list of the jobs sent to the shards
+        """
+        batches = [[] for _ in range(self.shards)]
+        names = set()
+        for job in jobs:
+            if job.name in names:
+                continue
+            names.add(job.name)
+            batches[shard_of(job.name, self.shards)].append(job)
+        # pickle every batch first, so an unpicklable job adds nothing
+        data = [pickle.dumps(batch) if batch else None for batch in batches]
+        for commands, batch, batch_data in zip(self.commands, batches, data):
+            if batch:
+                self.jobs.update((job.name, job) for job in batch)
+                commands.put((ADD, batch_data))
+        return [job for batch in batches for job in batch]
+
+    def remove_jobs(self, job_names=None):
+        """
+        delete many jobs, one message per shard
+        :return: list of the deleted job names
+        """
+        batches = [[] for _ in range(self.shards)]
+        for name in job_names:
+            if self.jobs.pop(name, None) is not None:
+                batches[shard_of(name, self.shards)].append(name)
+        for commands, batch in zip(self.commands, batches):
+            if batch:
+                commands.put((DELETE, batch))
+        return [name for batch in batches for name in batch]
+
+    def del_job(self, job_name: str = None):
+        if job_name in self.jobs:
+            del self.jobs[job_name]
+            self.commands[shard_of(job_name, self.shards)].put(
+                (DELETE, [job_name]))
+        else:
+            logger.info(f'{job_name} is in scheduler jobs list')
+
+    async def stats(self, timeout: float = 5):
+        """
+        collect the stats of every shard
+        :return: dict of summed stats, with the list of shard stats
+        :       under 'shards'
+        """
+        self._stats_id += 1
+        stats_id = self._stats_id
+        for commands in self.commands:
+            commands.put((STATS, stats_id))
+        loop = asyncio.get_event_loop()
+        shards = [None] * self.shards
+        deadline = loop.time() + timeout
+        while None in shards:
+            remain = deadline - loop.time()
+            if remain <= 0:
+                break
+            try:
+                reply_id, index, stats = await loop.run_in_executor(
+                    None, self.results.get, True, remain)
+            except queue.Empty:
+                break
+            if reply_id == stats_id:
+                shards[index] = stats
+        result = {}
+        for stats in shards:
+            for key, value in (stats or {}).items():
+                result[key] = result.get(key, 0) + value
+        result['shards'] = shards
+        return result
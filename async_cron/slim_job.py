@@ -0,0 +1,289 @@
+import asyncio
+import functools
+import inspect
+import itertools
+import logging
+from .job import JobBuilder, get_tzinfo, NOT_RUN, UNIT_SECONDS
+
+logger = logging.getLogger(__package__)
+
+# shared callables, SlimJob.go accepts their registered name
+CALLABLES = {}
+
+# next_fire of a job that will never run again
+NEVER = float('inf')
+
+NO_TIME = (None, None)
+NO_ARGS = ()
+
+_job_ids = itertools.count()
+
+
+def register(name: str = None, func=None):
+    """
+    register a callable shared by many jobs, usable as decorator:
+    @register('report')
+    :param name: name passed to SlimJob.go instead of the callable
+    """
+    if func is None:
+        return lambda func: register(name, func)
+    CALLABLES[name] = func
+    return func
+
+
+class SlimJob(JobBuilder):
+    """
+    compact periodic job for very large job counts.
+    same fluent api as CronJob, but without instance dict,
+    times are integer epoch seconds and function arguments
+    are kept as is instead of a functools.partial
+    """
+
+    __slots__ = ('name', 'interval', 'unit', 'func', 'args', 'kwargs',
+                 'at_time', 'at_exact_time', 'last_run', 'next_run',
+                 'next_fire', 'run_count', 'run_total', 'start_hour',
+                 'end_hour', 'week_day', 'month_day', 'cron_expression',
+                 'scheduler', 'gte_day', 'tz', 'tolerance')
+
+    def __init__(self,
+                 name: str = None,
+                 interval: int = 1,
+                 scheduler=None,
+                 loop=None,
+                 tz: str = None,
+                 run_total: int = None,
+                 tolerance: int = 10):
+        """
+        same parameters as CronJob, loop is ignored, coroutines
+        run as scheduler tasks, or on the running loop without scheduler
+        """
+        self.name = name or f'slim-{next(_job_ids)}'
+        self.interval = interval
+        self.unit = None
+        self.func = None
+        self.args = NO_ARGS
+        self.kwargs = None
+        self.at_time = NO_TIME
+        self.at_exact_time = None
+        self.last_run = None
+        self.next_run = None
+        # None until computed, NEVER if the job will not run again
+        self.next_fire = None
+        self.run_count = 0
+        self.run_total = run_total
+        self.start_hour = None
+        self.end_hour = None
+        self.week_day = None
+        self.month_day = None
+        self.cron_expression = None
+        self.scheduler = scheduler
+        self.gte_day = False
+        self.tz = tz
+        get_tzinfo(tz)
+        self.tolerance = tolerance
+
+    def __repr__(self):
+        return f"{self.name}-{self.interval}:{self.unit}-{self.at_time}\
+            -{self.at_exact_time}-{self.run_total}"
+
+    def __eq__(self, job=None):
+        if (self.interval == job.interval and self.unit == job.unit
+                and self.at_time == job.at_time
+                and self.run_total == job.run_total
+                and self.at_exact_time == job.at_exact_time
+                and self.cron_expression == job.cron_expression):
+            return True
+        else:
+            return False
+
+    def __getstate__(self):
+        return tuple(None if i == 'scheduler' else getattr(self, i)
+                     for i in self.__slots__)
+
+    def __setstate__(self, state=None):
+        for name, value in zip(self.__slots__, state):
+            setattr(self, name, value)
+
+    def at(self, time_string: str = None, time_shift: float = None):
+        super().at(time_string, time_shift)
+        if self.at_exact_time is not None:
+            self.at_exact_time = int(self.at_exact_time)
+        return self
+
+    def go(self, job_func, *args, **kwargs):
+        """
+        :param job_func: callable, or name of a registered callable
+        """
+        self.func = job_func
+        self.args = args or NO_ARGS
+        self.kwargs = kwargs or None
+        return self
+
+    @property
+    def job_func(self):
+        func = self.func
+        if isinstance(func, str):
+            func = CALLABLES[func]
+        return func
+
+    def decide_run(self, now=None):
+        """
+        :param now: current epoch seconds or arrow time,
+        :       default to the clock time
+        """
+        timestamp = int(self.timestamp_of(now))
+        if self.next_fire is None:
+            self.refresh_next_fire(timestamp)
+        if self.at_exact_time:
+            return 0 <= timestamp - self.next_fire <= self.tolerance
+        return timestamp >= self.next_fire
+
+    def next_fire_after(self, now=None):
+        timestamp = self._fire_after(int(self.timestamp_of(now)),
+                                     self.next_run, self.run_count)
+        return self.to_arrow(timestamp)
+
+    def refresh_next_fire(self, now=None):
+        """
+        scheduled time of the next run, anchored to next_run
+        """
+        next_run = self.next_run
+        if next_run is None:
+            timestamp = self._fire_after(int(self.timestamp_of(now)), None,
+                                         self.run_count)
+        elif self.run_total and self.run_count >= self.run_total:
+            timestamp = None
+        elif (self.cron_expression is not None
+              or not self.has_window()):
+            timestamp = next_run
+        else:
+            timestamp = self._fire_after(next_run, next_run, self.run_count)
+        self.next_fire = NEVER if timestamp is None else timestamp
+        return timestamp
+
+    def upcoming(self, count: int = 10, now=None):
+        now = int(self.timestamp_of(now))
+        next_run, run_count = self.next_run, self.run_count
+        result = []
+        while len(result) < count:
+            fire = self._fire_after(now, next_run, run_count)
+            if fire is None:
+                break
+            result.append(self.to_arrow(fire))
+            if self.at_exact_time or (self.cron_expression is None
+                                      and not isinstance(self.unit, str)):
+                break
+            run_count += 1
+            next_run = self.shift_timestamp(fire)
+            now = fire + 1
+        return result
+
+    def fire_time(self, timestamp: float = None):
+        return int(timestamp)
+
+    def get_state(self):
+        return (self.last_run, self.next_run, self.run_count)
+
+    def set_state(self, state=None):
+        last_run, next_run, self.run_count = state
+        self.last_run = None if last_run is None else int(last_run)
+        self.next_run = None if next_run is None else int(next_run)
+        self.next_fire = None
+
+    def remove(self):
+        if self.run_total:
+            if self.run_count >= self.run_total:
+                return True
+        return False
+
+    def run(self, now=None, execute: bool = True):
+        """
+        :param now: current epoch seconds or arrow time,
+        :       default to the clock time
+        :param execute: False if the run is claimed by another node
+        :return: result of the run, NOT_RUN if none started
+        """
+        if self.func is None:
+            return NOT_RUN
+        now = int(self.timestamp_of(now))
+        if self.next_fire is None:
+            self.refresh_next_fire(now)
+        self.last_run = now
+        tmp_result = NOT_RUN
+        try:
+            if not execute:
+                self.run_count += 1
+            elif self.accept_run():
+                self.run_count += 1
+                tmp_result = self.call()
+        finally:
+            self.gen_next_run()
+            self.refresh_next_fire(now)
+        return tmp_result
+
+    def accept_run(self):
+        """
+        apply the scheduler limits to a new run
+        :return: True if the run may start
+        """
+        return self.scheduler is None or self.scheduler.accept_run(self)
+
+    def call(self):
+        executor = None
+        if self.scheduler is not None:
+            executor = self.scheduler.get_executor()
+        if (executor is not None
+                and not asyncio.iscoroutinefunction(self.job_func)):
+            return self.scheduler.spawn(self, self.run_in_executor(executor))
+        if self.kwargs:
+            tmp_result = self.job_func(*self.args, **self.kwargs)
+        else:
+            tmp_result = self.job_func(*self.args)
+        if inspect.iscoroutine(tmp_result):
+            if self.scheduler is not None:
+                tmp_result = self.scheduler.spawn(self, tmp_result)
+            else:
+                tmp_result = asyncio.ensure_future(tmp_result)
+        return tmp_result
+
+    async def run_in_executor(self, executor=None):
+        func = self.job_func
+        if self.kwargs:
+            func = functools.partial(func, *self.args, **self.kwargs)
+        elif self.args:
+            func = functools.partial(func, *self.args)
+        tmp_result = await asyncio.get_event_loop().run_in_executor(
+            executor, func)
+        if inspect.iscoroutine(tmp_result):
+            tmp_result = await tmp_result
+        return tmp_result
+
+    def gen_next_run(self):
+        """
+        next run anchored to the scheduled time of the last run,
+        missed runs are always covered by one run
+        """
+        if not self.at_exact_time:
+            if self.cron_expression is None and not isinstance(self.unit, str):
+                raise Exception(
+                    f"self.unit must be specified: self.unit->{self.unit}")
+            fire = self.next_fire
+            if fire is None or fire == NEVER:
+                fire = self.last_run
+            step = UNIT_SECONDS.get(self.unit)
+            if step is not None and self.cron_expression is None:
+                step *= self.interval
+                self.next_run = fire + (
+                    (self.last_run - fire) // step + 1) * step
+                return
+            next_run = self.shift_timestamp(fire)
+            while next_run is not None and next_run <= self.last_run:
+                next_run = self.shift_timestamp(next_run)
+            self.next_run = next_run
+
+    def shift_timestamp(self, last_run: int = None):
+        step = UNIT_SECONDS.get(self.unit)
+        if step is not None and self.cron_expression is None:
+            return last_run + step * self.interval
+        next_run = self.shift_next_run(last_run)
+        return None if next_run is None else int(next_run)
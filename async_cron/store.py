@@ -0,0 +1,84 @@
+import sqlite3
+
+
+class StateStore:
+    """
+    job state backend, a state is (last_run, next_run, run_count),
+    times are epoch seconds or None.
+    methods are blocking, the scheduler calls them from a worker thread
+    """
+
+    def load(self):
+        """
+        :return: dict, job name -> state
+        """
+        raise NotImplementedError
+
+    def save(self, states=None):
+        """
+        :param states: dict, job name -> state
+        """
+        raise NotImplementedError
+
+    def delete(self, names=None):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class MemoryStateStore(StateStore):
+    """
+    keeps states in memory, for tests and as reference implementation
+    """
+
+    def __init__(self):
+        self.states = {}
+
+    def load(self):
+        return dict(self.states)
+
+    def save(self, states=None):
+        self.states.update(states)
+
+    def delete(self, names=None):
+        for name in names:
+            self.states.pop(name, None)
+
+
+class SQLiteStateStore(StateStore):
+    """
+    keeps states in a sqlite file, every save is one transaction
+    """
+
+    def __init__(self, path: str = 'async_cron.db'):
+        self.path = path
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute('CREATE TABLE IF NOT EXISTS job_state ('
+                                'name TEXT PRIMARY KEY, '
+                                'last_run REAL, '
+                                'next_run REAL, '
+                                'run_count INTEGER)')
+        self.connection.commit()
+
+    def load(self):
+        rows = self.connection.execute(
+            'SELECT name, last_run, next_run, run_count FROM job_state')
+        return {name: (last_run, next_run, run_count)
+                for name, last_run, next_run, run_count in rows}
+
+    def save(self, states=None):
+        with self.connection:
+            self.connection.executemany(
+                'INSERT OR REPLACE INTO job_state '
+                '(name, last_run, next_run, run_count) VALUES (?, ?, ?, ?)',
+                [(name, *state) for name, state in states.items()])
+
+    def delete(self, names=None):
+        with self.connection:
+            self.connection.executemany(
+                'DELETE FROM job_state WHERE name = ?',
+                [(name, ) for name in names])
+
+    def close(self):
+        self.connection.close()
@@ -0,0 +1,118 @@
+import math
+
+# seconds of a day, keys due after today wait in day buckets
+DAY = 86400
+
+
+class TimingWheel:
+    """
+    hierarchical timing wheel of keys due at epoch seconds.
+    keys due in the current minute wait in second slots, in the current
+    hour in minute slots, today in hour slots and later in day buckets.
+    a slot is cascaded into the lower level when its time comes,
+    add and discard are O(1) and advance only touches the slots it passes
+    """
+
+    def __init__(self, timestamp: float = 0):
+        """
+        :param timestamp: current time, keys are due after it
+        """
+        # last second advanced over
+        self.current = int(timestamp)
+        self.seconds = [{} for _ in range(60)]
+        self.minutes = [{} for _ in range(60)]
+        self.hours = [{} for _ in range(24)]
+        # day number -> bucket
+        self.days = {}
+        # keys of seconds, minutes, hours and days
+        self.counts = [0, 0, 0, 0]
+        # key -> (bucket, level)
+        self.entries = {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def add(self, key=None, timestamp: float = None):
+        """
+        (re)schedule key, times already passed are due at the next second
+        """
+        self.discard(key)
+        second = max(math.ceil(timestamp), self.current + 1)
+        self.place(key, second, self.current + 1)
+
+    def discard(self, key=None):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            bucket, level = entry
+            del bucket[key]
+            self.counts[level] -= 1
+
+    def place(self, key=None, second: int = None, base: int = None):
+        """
+        :param base: second being advanced over, not later than second
+        """
+        if second // 60 == base // 60:
+            level, bucket = 0, self.seconds[second % 60]
+        elif second // 3600 == base // 3600:
+            level, bucket = 1, self.minutes[second // 60 % 60]
+        elif second // DAY == base // DAY:
+            level, bucket = 2, self.hours[second // 3600 % 24]
+        else:
+            level = 3
+            bucket = self.days.get(second // DAY)
+            if bucket is None:
+                bucket = self.days[second // DAY] = {}
+        bucket[key] = second
+        self.entries[key] = (bucket, level)
+        self.counts[level] += 1
+
+    def cascade(self, bucket=None, level: int = None, base: int = None):
+        if not bucket:
+            return
+        self.counts[level] -= len(bucket)
+        items = list(bucket.items())
+        bucket.clear()
+        for key, second in items:
+            self.place(key, second, base)
+
+    def advance(self, timestamp: float = None):
+        """
+        move the wheel to timestamp
+        :return: list of the keys due, they are removed from the wheel
+        """
+        end = int(timestamp)
+        counts, entries = self.counts, self.entries
+        due = []
+        while self.current < end:
+            second = self.current + 1
+            if second % 60 == 0:
+                if second % 3600 == 0:
+                    if second % DAY == 0:
+                        self.cascade(self.days.pop(second // DAY, None), 3,
+                                     second)
+                    self.cascade(self.hours[second // 3600 % 24], 2, second)
+                self.cascade(self.minutes[second // 60 % 60], 1, second)
+            bucket = self.seconds[second % 60]
+            if bucket:
+                counts[0] -= len(bucket)
+                for key in bucket:
+                    del entries[key]
+                due.extend(bucket)
+                bucket.clear()
+            self.current = second
+            # jump over the seconds of empty levels
+            if not counts[0]:
+                if counts[1]:
+                    span = 60
+                elif counts[2]:
+                    span = 3600
+                elif counts[3]:
+                    span = DAY
+                else:
+                    self.current = end
+                    break
+                self.current = min(end, (second // span + 1) * span - 1)
+        return due
@@ -0,0 +1,167 @@
+import bisect
+import calendar
+import datetime
+import math
+
+from dateutil import tz
+
+# step probing for the next offset change, shorter than any dst period
+PROBE = 86400
+# periods are searched at most this far around the instant looked up
+HORIZON = 366 * 86400
+
+# wall clock times are seconds since this naive datetime
+EPOCH = datetime.datetime(1970, 1, 1)
+EPOCH_ORDINAL = EPOCH.toordinal()
+
+
+class Zone:
+    """
+    utc offsets of a timezone, found once per period of constant offset
+    (a dst period) and kept in a sorted table, so converting between epoch
+    seconds and wall clock seconds is a lookup.
+    wall clock times skipped when the clocks go forward are moved forward
+    by the skipped time, 02:30 of a skipped hour is 03:30.
+    wall clock times repeated when the clocks go back are their first
+    instant, unless it is before the earliest instant asked for
+    """
+
+    def __init__(self, tzinfo=None):
+        """
+        :param tzinfo: tzinfo of the timezone, default to the local one
+        """
+        self.tzinfo = tzinfo or tz.tzlocal()
+        # periods of constant offset, sorted by start
+        self.starts = []
+        self.ends = []
+        self.offsets = []
+        # period of the last lookup
+        self.start = self.end = 0
+        self.offset_seconds = 0
+
+    def __repr__(self):
+        return f"Zone({self.tzinfo!r})"
+
+    def utcoffset(self, timestamp: int = None):
+        """
+        offset at timestamp asked to tzinfo, without the table
+        """
+        time = datetime.datetime.fromtimestamp(timestamp, self.tzinfo)
+        return int(time.utcoffset().total_seconds())
+
+    def offset(self, timestamp: float = None):
+        """
+        :return: utc offset in seconds at the epoch timestamp
+        """
+        if self.start <= timestamp < self.end:
+            return self.offset_seconds
+        index = bisect.bisect_right(self.starts, timestamp) - 1
+        if index >= 0 and timestamp < self.ends[index]:
+            start, end = self.starts[index], self.ends[index]
+            offset = self.offsets[index]
+        else:
+            start, end, offset = self.find_period(math.floor(timestamp))
+            # periods cut by the horizon do not overlap their neighbours
+            if index >= 0:
+                start = max(start, self.ends[index])
+            if index + 1 < len(self.starts):
+                end = min(end, self.starts[index + 1])
+            self.starts.insert(index + 1, start)
+            self.ends.insert(index + 1, end)
+            self.offsets.insert(index + 1, offset)
+        self.start, self.end, self.offset_seconds = start, end, offset
+        return offset
+
+    def find_period(self, timestamp: int = None):
+        """
+        :return: (start, end, offset) of the period around timestamp
+        """
+        offset = self.utcoffset(timestamp)
+        return (self.find_change(timestamp, offset, -PROBE) + 1,
+                self.find_change(timestamp, offset, PROBE), offset)
+
+    def find_change(self, timestamp: int = None, offset: int = None,
+                    step: int = None):
+        """
+        nearest second from timestamp in the direction of step whose offset
+        is not offset, or the horizon if there is none
+        """
+        same = timestamp
+        for _ in range(HORIZON // PROBE):
+            probe = same + step
+            if self.utcoffset(probe) != offset:
+                # bisect between the last same and the first changed second
+                while abs(probe - same) > 1:
+                    middle = (same + probe) // 2
+                    if self.utcoffset(middle) == offset:
+                        same = middle
+                    else:
+                        probe = middle
+                return probe
+            same = probe
+        return same
+
+    def to_local(self, timestamp: float = None):
+        """
+        :return: wall clock seconds, seconds since EPOCH in this timezone
+        """
+        return timestamp + self.offset(timestamp)
+
+    def to_utc(self, local: float = None, earliest: float = None):
+        """
+        :param local: wall clock seconds
+        :param earliest: epoch seconds, a repeated time whose first instant
+        :       is before it is its second instant
+        :return: epoch seconds
+        """
+        before = self.offset(local - 86400)
+        after = self.offset(local + 86400)
+        if before == after:
+            return local - before
+        instants = sorted(local - offset for offset in (before, after)
+                          if self.offset(local - offset) == offset)
+        if not instants:
+            # skipped, the offset before the gap moves it forward
+            return local - before
+        if earliest is not None:
+            for instant in instants:
+                if instant >= earliest:
+                    return instant
+        return instants[0]
+
+
+def local_datetime(local: float = None):
+    """
+    :param local: wall clock seconds
+    :return: naive datetime of the wall clock
+    """
+    return EPOCH + datetime.timedelta(seconds=local)
+
+
+def from_local_datetime(time=None):
+    """
+    :param time: naive datetime of a wall clock
+    :return: wall clock seconds
+    """
+    return (time - EPOCH).total_seconds()
+
+
+def day_of_month(day: int = None):
+    """
+    :param day: days since EPOCH
+    """
+    return datetime.date.fromordinal(day + EPOCH_ORDINAL).day
+
+
+def shift_months(local: float = None, months: int = None):
+    """
+    same wall clock time months later, the day is clamped to the month end
+    """
+    day, seconds = divmod(local, 86400)
+    date = datetime.date.fromordinal(int(day) + EPOCH_ORDINAL)
+    month = date.month - 1 + months
+    year = date.year + month // 12
+    month = month % 12 + 1
+    date = datetime.date(year, month,
+                         min(date.day, calendar.monthrange(year, month)[1]))
+    return (date.toordinal() - EPOCH_ORDINAL) * 86400 + seconds
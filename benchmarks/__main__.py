@@ -0,0 +1,44 @@
+"""
+run the benchmark suite
+
+    python -m benchmarks [--quick]
+
+every benchmark also runs alone, see python -m benchmarks.bench_<name>
+"""
+import logging
+import sys
+
+from benchmarks import (bench_coroutine, bench_epoch, bench_events, bench_lag,
+                        bench_memory, bench_parse, bench_scale, bench_seconds,
+                        bench_spread, bench_tick)
+
+
+def main(quick=False):
+    # running lines of thousands of jobs would dominate the results
+    logging.getLogger('async_cron').setLevel(logging.WARNING)
+    suite = [
+        ('check_jobs cost by job count', bench_scale.main,
+         (1000, 10000) if quick else ()),
+        ('sub-second ticks of second jobs', bench_seconds.main,
+         (1000, 10000) if quick else ()),
+        ('firing lag', bench_lag.main, (200, 600) if quick else ()),
+        ('memory per job', bench_memory.main, (10000, ) if quick else ()),
+        ('crontab parse', bench_parse.main, (2000, ) if quick else ()),
+        ('coroutine jobs', bench_coroutine.main, (2000, ) if quick else ()),
+        ('timezone snapshot per tick', bench_tick.main,
+         (2000, ) if quick else ()),
+        ('event logging on the firing path', bench_events.main,
+         (1000, ) if quick else ()),
+        ('epoch seconds instead of arrow', bench_epoch.main,
+         (2000, ) if quick else ()),
+        ('jobs sharing a schedule', bench_spread.main,
+         (1000, ) if quick else ()),
+    ]
+    for title, func, args in suite:
+        print(f'== {title}')
+        func(*args)
+        print()
+
+
+if __name__ == '__main__':
+    main(quick='--quick' in sys.argv[1:])
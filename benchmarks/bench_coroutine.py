@@ -0,0 +1,41 @@
+"""
+throughput of coroutine jobs, due in one tick of a virtual clock
+
+    python -m benchmarks.bench_coroutine [job_count] [max_concurrency]
+"""
+import asyncio
+import sys
+import time
+
+import arrow
+
+from async_cron.job import CronJob
+from async_cron.schedule import Scheduler
+
+
+async def work():
+    await asyncio.sleep(0)
+
+
+def measure(count, max_concurrency):
+    loop = asyncio.get_event_loop()
+    scheduler = Scheduler(max_concurrency=max_concurrency)
+    for i in range(count):
+        scheduler.add_job(CronJob(name=f'job{i}').every(1).second.go(work))
+    now = arrow.utcnow().shift(seconds=1)
+    started = time.perf_counter()
+    loop.run_until_complete(scheduler.check_jobs(now))
+    loop.run_until_complete(scheduler.join())
+    return time.perf_counter() - started
+
+
+def main(count=10000, max_concurrency=100):
+    asyncio.set_event_loop(asyncio.new_event_loop())
+    print(f'{count} coroutine runs')
+    for limit in (None, max_concurrency):
+        elapsed = measure(count, limit)
+        print(f'max_concurrency={limit}: {count / elapsed:,.0f} runs/s')
+
+
+if __name__ == '__main__':
+    main(*[int(i) for i in sys.argv[1:]])
@@ -0,0 +1,73 @@
+"""
+timing math of a job on arrow times against epoch seconds
+
+    python -m benchmarks.bench_epoch [count]
+
+before: arrow comparisons and shift(**{unit: interval}) of the previous
+release, after: CronJob on epoch seconds with cached timezone offsets
+"""
+import sys
+import timeit
+
+import arrow
+
+from async_cron.job import CronJob, day_minutes, first_fire_after
+from async_cron.units import SECOND, HOUR, DAY, MONTH
+
+TZ = 'Europe/Berlin'
+
+
+def legacy_first_fire_after(now, at_time=(None, None), week_day=None,
+                            month_day=None):
+    """
+    first_fire_after of the previous release
+    """
+    windows = day_minutes(at_time)
+    day = now.floor('day')
+    for _ in range(366 * 5):
+        if ((week_day is None or week_day == day.weekday())
+                and (not month_day or month_day == day.day)):
+            for hour, first, last in windows:
+                begin = day.replace(hour=hour, minute=first)
+                end = day.replace(hour=hour, minute=last).shift(minutes=1)
+                if now < end:
+                    return max(now, begin)
+        day = day.shift(days=1)
+    return None
+
+
+def per_call(func, count):
+    return min(timeit.repeat(func, number=count, repeat=5)) / count
+
+
+def compare(title, before, after, count):
+    before, after = per_call(before, count), per_call(after, count)
+    print(f'{title:<22} {before * 1e6:>9.2f} {after * 1e6:>9.2f} '
+          f'{before / after:>7.1f}x')
+
+
+def main(count=20000):
+    now = arrow.utcnow().to(TZ)
+    timestamp = now.timestamp()
+    print(f'us per call{"before":>20} {"after":>9} {"speedup":>8}')
+    # a job checked by a tick, not due yet
+    job = CronJob(name='check', tz=TZ).every(10).minute.go(print)
+    job.refresh_next_fire(timestamp + 60)
+    fire = now.shift(seconds=60)
+    compare('decide_run', lambda: now < fire,
+            lambda: job.decide_run(timestamp), count)
+    for unit in (SECOND, HOUR, DAY, MONTH):
+        job = CronJob(name=unit, tz=TZ, interval=5)
+        job.unit = unit
+        compare(f'next run, {unit}',
+                lambda: now.shift(**{job.unit: job.interval}),
+                lambda: job.shift_next_run(timestamp), count)
+    zone = CronJob(tz=TZ).zone
+    compare('weekday search',
+            lambda: legacy_first_fire_after(now, (9, 30), week_day=6),
+            lambda: first_fire_after(timestamp, zone, (9, 30), week_day=6),
+            count // 10)
+
+
+if __name__ == '__main__':
+    main(*[int(i) for i in sys.argv[1:]])
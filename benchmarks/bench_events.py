@@ -0,0 +1,67 @@
+"""
+cost of logging on the firing hot path, Scheduler.run_job
+
+    python -m benchmarks.bench_events [run_count]
+
+before: every run humanizes its time in an f-string, even with INFO disabled,
+after: events are built only when their level is enabled,
+json: events written as json lines to a discarded stream
+"""
+import io
+import logging
+import sys
+import timeit
+
+from async_cron.events import JSONFormatter
+from async_cron.job import CronJob
+from async_cron.schedule import Scheduler
+
+logger = logging.getLogger('async_cron')
+
+
+class LegacyScheduler(Scheduler):
+    """
+    Scheduler with the run_job logging of the previous release
+    """
+
+    def run_job(self, job=None, now=None, remove=True, execute=True):
+        now = job.to_arrow(now)
+        logger.info(f'runing:{job.name}:{now.humanize(locale=self.locale)}')
+        job.run(now)
+        return False
+
+
+def noop():
+    pass
+
+
+def measure(scheduler, count):
+    job = CronJob(name='job').every(1).second.go(noop)
+    scheduler.add_job(job)
+    # fire every run at its scheduled time
+    return min(
+        timeit.repeat(
+            lambda: scheduler.run_job(job, job.next_fire, remove=False),
+            number=count,
+            repeat=5)) / count
+
+
+def main(count=10000):
+    logger.setLevel(logging.WARNING)
+    before = measure(LegacyScheduler(), count)
+    after = measure(Scheduler(), count)
+    handler = logging.StreamHandler(io.StringIO())
+    handler.setFormatter(JSONFormatter())
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    json_lines = measure(Scheduler(), count)
+    logger.removeHandler(handler)
+    print(f'per run, INFO disabled')
+    print(f'before: {before * 1e6:.1f} us')
+    print(f'after:  {after * 1e6:.1f} us')
+    print(f'speedup: {before / after:.1f}x')
+    print(f'json lines enabled: {json_lines * 1e6:.1f} us')
+
+
+if __name__ == '__main__':
+    main(*[int(i) for i in sys.argv[1:]])
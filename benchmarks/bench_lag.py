@@ -0,0 +1,84 @@
+"""
+distribution of the firing lag, actual minus scheduled fire time
+
+    python -m benchmarks.bench_lag [job_count] [virtual_seconds]
+
+poll ticks every check_interval of a virtual clock, heap jumps the
+virtual clock to the next due job, so the lag only comes from the mode
+"""
+import asyncio
+import random
+import sys
+import time
+
+from async_cron.job import CronJob
+from async_cron.schedule import Scheduler, POLL, HEAP
+
+CHECK_INTERVAL = 5
+PERCENTILES = (50, 90, 99, 100)
+
+
+class LagScheduler(Scheduler):
+    """
+    Scheduler recording the lag of every run
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lags = []
+
+    def run_job(self, job=None, now=None, remove=True, execute=True):
+        fire = self.fire_timestamp(job)
+        if fire is not None:
+            self.lags.append(now - fire)
+        return super().run_job(job, now, remove, execute)
+
+
+def noop():
+    pass
+
+
+def percentile(values, rank):
+    values = sorted(values)
+    index = min(len(values) - 1, len(values) * rank // 100)
+    return values[index]
+
+
+def measure(mode, count, duration):
+    random.seed(0)
+    loop = asyncio.get_event_loop()
+    scheduler = LagScheduler(mode=mode, check_interval=CHECK_INTERVAL)
+    # jobs first fire when they are added, not before the virtual start
+    start = now = time.time()
+    for i in range(count):
+        scheduler.add_job(
+            CronJob(name=f'job{i}').every(random.randint(7, 120)).second.go(
+                noop))
+    end = start + duration
+    while now < end:
+        if mode == POLL:
+            loop.run_until_complete(scheduler.check_jobs(now))
+            now += CHECK_INTERVAL
+        else:
+            loop.run_until_complete(scheduler.run_due_jobs(now))
+            due = scheduler.next_due()
+            if due is None:
+                break
+            now = max(due, now)
+    return scheduler.lags
+
+
+def main(count=1000, duration=3600):
+    asyncio.set_event_loop(asyncio.new_event_loop())
+    print(f'{count} jobs, {duration}s virtual time, lag in ms')
+    header = ' '.join(f'p{i:<7}' for i in PERCENTILES)
+    print(f'{"mode":>5} {"runs":>7} {header}')
+    for mode in (POLL, HEAP):
+        lags = measure(mode, count, duration)
+        values = ' '.join(f'{percentile(lags, i) * 1000:<8.1f}'
+                          for i in PERCENTILES)
+        print(f'{mode:>5} {len(lags):>7} {values}')
+
+
+if __name__ == '__main__':
+    main(*[int(i) for i in sys.argv[1:]])
@@ -0,0 +1,55 @@
+"""
+memory per job, CronJob compared with SlimJob
+
+    python -m benchmarks.bench_memory [job_count]
+"""
+import asyncio
+import gc
+import sys
+import tracemalloc
+
+from async_cron.job import CronJob
+from async_cron.slim_job import SlimJob, register
+
+
+@register('report')
+def report(*args, **kwargs):
+    pass
+
+
+def make_cron_jobs(count):
+    return [
+        CronJob(run_total=10).every(5).minute.at(':10').go(report, i)
+        for i in range(count)
+    ]
+
+
+def make_slim_jobs(count):
+    return [
+        SlimJob(run_total=10).every(5).minute.at(':10').go('report', i)
+        for i in range(count)
+    ]
+
+
+def measure(factory, count):
+    gc.collect()
+    tracemalloc.start()
+    jobs = factory(count)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del jobs
+    return size
+
+
+def main(count=100000):
+    asyncio.set_event_loop(asyncio.new_event_loop())
+    before = measure(make_cron_jobs, count)
+    after = measure(make_slim_jobs, count)
+    print(f'{count} jobs, bytes per job')
+    print(f'CronJob: {before / count:.0f}')
+    print(f'SlimJob: {after / count:.0f}')
+    print(f'ratio: {before / after:.1f}x')
+
+
+if __name__ == '__main__':
+    main(*[int(i) for i in sys.argv[1:]])
@@ -0,0 +1,35 @@
+"""
+crontab line parse throughput of JobLoader.parse
+
+    python -m benchmarks.bench_parse [line_count]
+"""
+import asyncio
+import sys
+import timeit
+
+from async_cron.job_loader import JobLoader
+
+
+def make_lines(count):
+    return [
+        f'{i % 60},{i % 24},*,*,mon-fri job{i} /bin/echo,{i} '
+        f'A={i},B=x {i % 10 + 1} 60' for i in range(count)
+    ]
+
+
+def main(count=10000):
+    asyncio.set_event_loop(asyncio.new_event_loop())
+    loader = JobLoader(name='bench', log_path='.')
+    lines = make_lines(count)
+    elapsed = min(
+        timeit.repeat(lambda: [loader.parse(line) for line in lines],
+                      number=1,
+                      repeat=3))
+    print(f'{count} lines')
+    print(f'{count / elapsed:,.0f} lines/s, {elapsed / count * 1e6:.1f} us '
+          f'per line')
+    loader.close()
+
+
+if __name__ == '__main__':
+    main(*[int(i) for i in sys.argv[1:]])
@@ -0,0 +1,68 @@
+"""
+cost of one scheduler tick against the number of jobs, per mode
+
+    python -m benchmarks.bench_scale [job_count ...]
+
+ticks run on a virtual clock passed to check_jobs and run_due_jobs,
+jobs fire every 10 minutes at spread offsets, so a tick runs few of them
+"""
+import asyncio
+import sys
+import time
+
+import arrow
+
+from async_cron.job import CronJob
+from async_cron.schedule import Scheduler, POLL, HEAP, WHEEL
+
+COUNTS = (1000, 10000, 100000)
+TICKS = 20
+CHECK_INTERVAL = 5
+
+
+def noop():
+    pass
+
+
+def make_scheduler(mode, count):
+    scheduler = Scheduler(mode=mode, check_interval=CHECK_INTERVAL)
+    for i in range(count):
+        scheduler.add_job(
+            CronJob(name=f'job{i}').every(10).minute.at(
+                f':{i % 60}').go(noop))
+    return scheduler
+
+
+def measure(mode, count):
+    """
+    :return: (seconds per tick, runs)
+    """
+    loop = asyncio.get_event_loop()
+    scheduler = make_scheduler(mode, count)
+    tick = scheduler.check_jobs if mode == POLL else scheduler.run_due_jobs
+    now = arrow.utcnow()
+    elapsed = 0
+    for _ in range(TICKS):
+        now = now.shift(seconds=CHECK_INTERVAL)
+        started = time.perf_counter()
+        loop.run_until_complete(tick(now))
+        elapsed += time.perf_counter() - started
+    runs = sum(job.run_count for job in scheduler.jobs.values())
+    return elapsed / TICKS, runs
+
+
+def main(*counts):
+    asyncio.set_event_loop(asyncio.new_event_loop())
+    print(f'ms per tick, {TICKS} ticks of {CHECK_INTERVAL}s')
+    print(f'{"jobs":>8} {"poll":>10} {"heap":>10} {"wheel":>10} '
+          f'{"runs":>6}')
+    for count in counts or COUNTS:
+        poll, runs = measure(POLL, count)
+        heap, _ = measure(HEAP, count)
+        wheel, _ = measure(WHEEL, count)
+        print(f'{count:>8} {poll * 1000:>10.2f} {heap * 1000:>10.2f} '
+              f'{wheel * 1000:>10.2f} {runs:>6}')
+
+
+if __name__ == '__main__':
+    main(*[int(i) for i in sys.argv[1:]])
@@ -0,0 +1,69 @@
+"""
+cost of sub-second ticks with second interval jobs
+
+    python -m benchmarks.bench_seconds [job_count ...]
+
+jobs run every 60 seconds at spread offsets, ticks of a virtual clock are
+TICK seconds apart, so most ticks have no due job and only a few have some
+"""
+import asyncio
+import sys
+import time
+
+import arrow
+
+from async_cron.job import CronJob
+from async_cron.schedule import Scheduler, POLL, HEAP, WHEEL
+
+COUNTS = (1000, 10000, 100000)
+TICK = 0.1
+TICKS = 100
+
+
+def noop():
+    pass
+
+
+def measure(mode, count):
+    """
+    :return: (seconds per tick, runs)
+    """
+    loop = asyncio.get_event_loop()
+    scheduler = Scheduler(mode=mode, check_interval=TICK)
+    now = arrow.utcnow()
+    scheduler.add_jobs(
+        CronJob(name=f'job{i}', tz='UTC').every(60).second.go(noop)
+        for i in range(count))
+    # spread the jobs over the minute
+    for i, job in enumerate(scheduler.jobs.values()):
+        job.next_run = now.timestamp() + i % 60
+        if mode != POLL:
+            scheduler.push_job(job)
+        else:
+            job.refresh_next_fire()
+    tick = scheduler.check_jobs if mode == POLL else scheduler.run_due_jobs
+    elapsed = 0
+    for _ in range(TICKS):
+        now = now.shift(seconds=TICK)
+        started = time.perf_counter()
+        loop.run_until_complete(tick(now))
+        elapsed += time.perf_counter() - started
+    runs = sum(job.run_count for job in scheduler.jobs.values())
+    return elapsed / TICKS, runs
+
+
+def main(*counts):
+    asyncio.set_event_loop(asyncio.new_event_loop())
+    print(f'ms per tick, {TICKS} ticks of {TICK}s')
+    print(f'{"jobs":>8} {"poll":>10} {"heap":>10} {"wheel":>10} '
+          f'{"runs":>6}')
+    for count in counts or COUNTS:
+        poll, runs = measure(POLL, count)
+        heap, _ = measure(HEAP, count)
+        wheel, _ = measure(WHEEL, count)
+        print(f'{count:>8} {poll * 1000:>10.2f} {heap * 1000:>10.2f} '
+              f'{wheel * 1000:>10.2f} {runs:>6}')
+
+
+if __name__ == '__main__':
+    main(*[int(i) for i in sys.argv[1:]])
@@ -0,0 +1,74 @@
+"""
+thundering herd of jobs sharing a schedule
+
+    python -m benchmarks.bench_spread [job_count ...]
+
+jobs run every hour at :00, ticks of a virtual clock are one second apart
+over two hours. without spread every run starts in the same tick, spread
+gives each job its own second of the hour and max_fires caps a tick
+"""
+import asyncio
+import sys
+import time
+
+from async_cron.job import CronJob
+from async_cron.schedule import Scheduler, HEAP
+
+COUNTS = (1000, 10000, 100000)
+HOUR = 3600
+
+
+# runs of the current measure
+runs = [0]
+
+
+def count_run():
+    runs[0] += 1
+
+
+def measure(count, **kwargs):
+    """
+    :return: (max runs in a tick, slowest tick seconds, ticks with runs,
+    :       runs)
+    """
+    loop = asyncio.get_event_loop()
+    # a second before an hour, the jobs run at the next two hours
+    start = (time.time() // HOUR + 1) * HOUR - 1
+    scheduler = Scheduler(mode=HEAP, check_interval=1, **kwargs)
+    scheduler.add_jobs(
+        CronJob(name=f'job{i}', tz='UTC').every().hour.at(':00').go(
+            count_run) for i in range(count))
+    for job in scheduler.jobs.values():
+        job.next_run = job.next_fire = None
+        scheduler.push_job(job, now=scheduler.job_time(job, start))
+    runs[0] = 0
+    busiest = slowest = busy = 0
+    for second in range(HOUR * 2):
+        before = runs[0]
+        started = time.perf_counter()
+        loop.run_until_complete(scheduler.run_due_jobs(start + second))
+        slowest = max(slowest, time.perf_counter() - started)
+        if runs[0] > before:
+            busiest = max(busiest, runs[0] - before)
+            busy += 1
+    return busiest, slowest, busy, runs[0]
+
+
+def main(*counts):
+    asyncio.set_event_loop(asyncio.new_event_loop())
+    print('hourly jobs at :00, one second ticks over two hours')
+    print(f'{"jobs":>8} {"setting":>14} {"max runs/tick":>14} '
+          f'{"slowest ms":>11} {"busy ticks":>11} {"runs":>7}')
+    for count in counts or COUNTS:
+        for setting, kwargs in (('none', {}), ('spread=3600', {
+                'spread': HOUR
+        }), ('max_fires=100', {
+                'max_fires': 100
+        })):
+            busiest, slowest, busy, total = measure(count, **kwargs)
+            print(f'{count:>8} {setting:>14} {busiest:>14} '
+                  f'{slowest * 1000:>11.2f} {busy:>11} {total:>7}')
+
+
+if __name__ == '__main__':
+    main(*[int(i) for i in sys.argv[1:]])
@@ -0,0 +1,78 @@
+"""
+per tick cost of Scheduler.check_jobs
+
+    python -m benchmarks.bench_tick [job_count]
+
+before: every job builds its own arrow.utcnow() and parses its timezone,
+after: one utc snapshot per tick, converted once per distinct timezone
+"""
+import arrow
+import asyncio
+import sys
+import timeit
+from dateutil import tz
+
+from async_cron.job import CronJob
+from async_cron.schedule import Scheduler
+
+TIMEZONES = ('Asia/Shanghai', 'Europe/Berlin', 'America/New_York', None)
+
+
+class LegacyCronJob(CronJob):
+    """
+    CronJob with the per call get_now of the previous release
+    """
+
+    def get_now(self, utcnow=None):
+        now = arrow.utcnow()
+        if self.tz:
+            now = now.to(self.tz)
+        else:
+            now = now.to(tz.tzlocal())
+        return now
+
+    def decide_run(self, now=None):
+        return super().decide_run(now or self.get_now())
+
+
+def make_jobs(job_class, count):
+    # never due while benchmarking, so only the check cost is measured
+    return [
+        job_class(name=f'job{i}',
+                  tz=TIMEZONES[i % len(TIMEZONES)]).every().hour.at(
+                      f'{(arrow.utcnow().hour + 12) % 24}:').go(print)
+        for i in range(count)
+    ]
+
+
+def legacy_tick(jobs):
+    for job in jobs:
+        if job.decide_run():
+            job.get_now()
+
+
+def main(count=10000, repeat=5):
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    legacy_jobs = make_jobs(LegacyCronJob, count)
+    scheduler = Scheduler(loop=loop)
+    for job in make_jobs(CronJob, count):
+        scheduler.add_job(job)
+
+    before = min(
+        timeit.repeat(lambda: legacy_tick(legacy_jobs),
+                      number=1,
+                      repeat=repeat))
+    after = min(
+        timeit.repeat(lambda: loop.run_until_complete(scheduler.check_jobs()),
+                      number=1,
+                      repeat=repeat))
+    print(f'{count} jobs, per tick')
+    print(f'before: {before * 1000:.1f} ms')
+    print(f'after:  {after * 1000:.1f} ms')
+    print(f'speedup: {before / after:.1f}x')
+    loop.close()
+
+
+if __name__ == '__main__':
+    main(*[int(i) for i in sys.argv[1:]])
@@ -68,7 +68,7 @@ setup(name='async_cron',
       author_email="aohan237@gmail.com",
       url="https://github.com/aohan237/async_cron",
       license="MIT",
-      packages=find_packages(exclude=["tests"]),
+      packages=find_packages(exclude=["tests", "benchmarks"]),
       install_requires=install_requires,
       include_package_data=True,
       )
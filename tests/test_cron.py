@@ -0,0 +1,102 @@
+import datetime
+import unittest
+
+from async_cron.cron import CronExpression, compile_cron
+
+
+def at(*args):
+    return datetime.datetime(*args)
+
+
+class CronTest(unittest.TestCase):
+    def next_after(self, expression, *args):
+        return compile_cron(expression).next_after(at(*args))
+
+    def test_ranges(self):
+        self.assertEqual(self.next_after('0 9-17 * * *', 2024, 3, 4, 12, 1),
+                         at(2024, 3, 4, 13, 0))
+        self.assertEqual(self.next_after('0 9-17 * * *', 2024, 3, 4, 17, 1),
+                         at(2024, 3, 5, 9, 0))
+        self.assertEqual(self.next_after('0,30 9 * * *', 2024, 3, 4, 9, 1),
+                         at(2024, 3, 4, 9, 30))
+
+    def test_steps(self):
+        self.assertEqual(self.next_after('*/15 * * * *', 2024, 3, 4, 10, 1),
+                         at(2024, 3, 4, 10, 15))
+        self.assertEqual(
+            self.next_after('1-30/10 * * * *', 2024, 3, 4, 10, 22),
+            at(2024, 3, 4, 11, 1))
+        self.assertEqual(self.next_after('50/5 * * * *', 2024, 3, 4, 10, 56),
+                         at(2024, 3, 4, 11, 50))
+
+    def test_names(self):
+        self.assertEqual(compile_cron('0 12 * * sun'),
+                         compile_cron('0 12 * * 7'))
+        self.assertEqual(compile_cron('0 12 * * SUN'),
+                         compile_cron('0 12 * * 0'))
+        # 2024-03-04 is a monday
+        self.assertEqual(self.next_after('0 0 * feb mon', 2024, 3, 4),
+                         at(2025, 2, 3))
+        self.assertEqual(self.next_after('0 9 * * mon-fri', 2024, 3, 8, 10),
+                         at(2024, 3, 11, 9, 0))
+
+    def test_last_day(self):
+        self.assertEqual(self.next_after('0 0 L * *', 2024, 2, 10),
+                         at(2024, 2, 29))
+        self.assertEqual(self.next_after('0 0 L * *', 2023, 2, 10),
+                         at(2023, 2, 28))
+        self.assertEqual(self.next_after('0 0 L * *', 2024, 4, 30, 0, 1),
+                         at(2024, 5, 31))
+        self.assertEqual(self.next_after('0 0 15,L * *', 2024, 4, 16),
+                         at(2024, 4, 30))
+        self.assertEqual(self.next_after('0 0 15;L * *', 2024, 4, 1),
+                         at(2024, 4, 15))
+        self.assertNotEqual(compile_cron('0 0 L * *'),
+                            compile_cron('0 0 * * *'))
+
+    def test_day_or_week(self):
+        # both restricted, the 13th or a friday
+        self.assertEqual(self.next_after('0 0 13 * fri', 2024, 3, 4),
+                         at(2024, 3, 8))
+        self.assertEqual(self.next_after('0 0 13 * fri', 2024, 3, 9),
+                         at(2024, 3, 13))
+        # week unrestricted, the 13th only
+        self.assertEqual(self.next_after('0 0 13 * *', 2024, 3, 4),
+                         at(2024, 3, 13))
+        # day unrestricted, fridays only
+        self.assertEqual(self.next_after('0 0 * * fri', 2024, 3, 9),
+                         at(2024, 3, 15))
+        # a step over `*` counts as unrestricted, as in crontab, so both
+        # fields must match: an odd day and a friday
+        self.assertEqual(self.next_after('0 0 */2 * fri', 2024, 3, 2, 1),
+                         at(2024, 3, 15))
+
+    def test_rounds_up_to_a_minute(self):
+        self.assertEqual(self.next_after('* * * * *', 2024, 3, 4, 10, 0),
+                         at(2024, 3, 4, 10, 0))
+        self.assertEqual(
+            self.next_after('* * * * *', 2024, 3, 4, 10, 0, 0, 1),
+            at(2024, 3, 4, 10, 1))
+
+    def test_no_match(self):
+        self.assertIsNone(self.next_after('0 0 30 feb *', 2024, 3, 4))
+
+    def test_match(self):
+        cron = compile_cron('0,30 9-17 * * mon-fri')
+        self.assertTrue(cron.match(at(2024, 3, 4, 9, 30)))
+        self.assertFalse(cron.match(at(2024, 3, 4, 9, 31)))
+        self.assertFalse(cron.match(at(2024, 3, 9, 9, 30)))
+
+    def test_cron_file_syntax(self):
+        self.assertEqual(compile_cron('0;30,9-17,*,*,mon-fri'),
+                         compile_cron('0,30 9-17 * * mon-fri'))
+
+    def test_invalid(self):
+        for expression in ('61 * * * *', '* * * *', '*/0 * * * *',
+                           '5-1 * * * *', '1,,2 * * * *'):
+            with self.assertRaises(ValueError):
+                CronExpression(expression)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+import asyncio
+import unittest
+
+from async_cron.clock import SimulatedClock
+from async_cron.dispatch import Dispatcher
+from async_cron.job import CronJob
+from async_cron.schedule import Scheduler, HEAP
+
+# 2024-03-04 00:00:00 UTC
+START = 1709510400
+
+
+class DispatcherTest(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        self.loop.close()
+
+    def start_order(self, dispatcher, runs):
+        """
+        queue runs behind a run holding the only slot, then release it
+        :param runs: list of (group, priority)
+        :return: groups in the order their runs got the slot
+        """
+        order = []
+
+        async def run(group, priority):
+            await dispatcher.acquire(group, priority)
+            order.append(group)
+            dispatcher.release(group)
+
+        async def scenario():
+            await dispatcher.acquire('holder')
+            tasks = [self.loop.create_task(run(*i)) for i in runs]
+            await asyncio.sleep(0)
+            dispatcher.release('holder')
+            await asyncio.gather(*tasks)
+
+        self.loop.run_until_complete(scenario())
+        return order
+
+    def test_weighted_fairness(self):
+        dispatcher = Dispatcher(1, {'a': 2})
+        order = self.start_order(dispatcher, [('a', 0)] * 8 + [('b', 0)] * 8)
+        # a weighs 2 and b 1 while both wait
+        self.assertEqual(order[:6].count('a'), 4)
+        self.assertEqual(order[:12].count('a'), 8)
+        self.assertEqual(order[12:], ['b'] * 4)
+
+    def test_idle_group_does_not_save_its_share(self):
+        dispatcher = Dispatcher(1)
+        self.start_order(dispatcher, [('a', 0)] * 6)
+        order = self.start_order(dispatcher, [('a', 0)] * 4 + [('b', 0)] * 4)
+        self.assertEqual(order[:4].count('b'), 2)
+
+    def test_priority_inside_group(self):
+        dispatcher = Dispatcher(1)
+        order = []
+
+        async def run(name, priority):
+            await dispatcher.acquire('a', priority)
+            order.append(name)
+            dispatcher.release('a')
+
+        async def scenario():
+            await dispatcher.acquire('a')
+            tasks = [self.loop.create_task(run(name, priority))
+                     for name, priority in (('low', 0), ('high', 5),
+                                            ('mid', 1), ('low2', 0))]
+            await asyncio.sleep(0)
+            dispatcher.release('a')
+            await asyncio.gather(*tasks)
+
+        self.loop.run_until_complete(scenario())
+        self.assertEqual(order, ['high', 'mid', 'low', 'low2'])
+
+    def test_limit(self):
+        dispatcher = Dispatcher(2)
+        peak = []
+
+        async def run():
+            await dispatcher.acquire()
+            peak.append(dispatcher.running)
+            await asyncio.sleep(0.001)
+            dispatcher.release()
+
+        async def scenario():
+            await asyncio.gather(*[run() for _ in range(10)])
+
+        self.loop.run_until_complete(scenario())
+        self.assertEqual(len(peak), 10)
+        self.assertEqual(max(peak), 2)
+        self.assertEqual(dispatcher.running, 0)
+
+    def test_cancelled_wait_frees_its_place(self):
+        now = [100.0]
+        dispatcher = Dispatcher(1, clock=lambda: now[0])
+
+        async def scenario():
+            await dispatcher.acquire('a')
+            first = self.loop.create_task(dispatcher.acquire('b'))
+            second = self.loop.create_task(dispatcher.acquire('b'))
+            await asyncio.sleep(0)
+            now[0] += 5
+            self.assertEqual(dispatcher.queued('b'), 2)
+            self.assertEqual(dispatcher.lag('b'), 5)
+            first.cancel()
+            await asyncio.sleep(0)
+            self.assertEqual(dispatcher.queued('b'), 1)
+            dispatcher.release('a')
+            await second
+            self.assertEqual(dispatcher.running, 1)
+            self.assertEqual(dispatcher.lag('b'), 0)
+
+        self.loop.run_until_complete(scenario())
+
+    def test_scheduler_max_concurrency(self):
+        scheduler = Scheduler(loop=self.loop, mode=HEAP, max_concurrency=2,
+                              clock=SimulatedClock(START, START + 1))
+        running = []
+        peak = []
+
+        async def work():
+            running.append(1)
+            peak.append(len(running))
+            await asyncio.sleep(0.01)
+            running.pop()
+
+        for i in range(6):
+            scheduler.add_job(
+                CronJob(name=f'job{i}', loop=self.loop,
+                        run_total=1).every(1).hour.go(work))
+
+        async def scenario():
+            await scheduler.start()
+            await scheduler.join()
+
+        self.loop.run_until_complete(scenario())
+        self.assertEqual(len(peak), 6)
+        self.assertEqual(max(peak), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
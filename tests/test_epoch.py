@@ -0,0 +1,81 @@
+import asyncio
+import calendar
+import unittest
+
+import arrow
+
+from async_cron.job import CronJob
+from async_cron.zone import (local_datetime, from_local_datetime,
+                             day_of_month, shift_months)
+
+
+def utc(*args):
+    return calendar.timegm(args + (0, ) * (6 - len(args)))
+
+
+class EpochTest(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        self.loop.close()
+
+    def upcoming(self, job, count, *now):
+        return [fire.timestamp() for fire in job.upcoming(count, utc(*now))]
+
+    def job(self, tz='UTC'):
+        return CronJob(name='epoch', loop=self.loop, tz=tz)
+
+    def test_wall_clock_helpers(self):
+        local = utc(2024, 2, 29, 13, 45, 10)
+        self.assertEqual(str(local_datetime(local)), '2024-02-29 13:45:10')
+        self.assertEqual(from_local_datetime(local_datetime(local)), local)
+        self.assertEqual(day_of_month(local // 86400), 29)
+
+    def test_shift_months_clamps_to_month_end(self):
+        start = utc(2024, 1, 31, 10)
+        self.assertEqual(shift_months(start, 1), utc(2024, 2, 29, 10))
+        self.assertEqual(shift_months(start, 13), utc(2025, 2, 28, 10))
+        self.assertEqual(shift_months(start, -2), utc(2023, 11, 30, 10))
+        for months in range(-30, 30):
+            self.assertEqual(
+                shift_months(start, months),
+                arrow.get(start).shift(months=months).int_timestamp)
+
+    def test_month_interval_matches_arrow_shift(self):
+        fires = self.upcoming(self.job().every(1).month, 5, 2024, 1, 31, 10)
+        expected = [arrow.get(utc(2024, 1, 31, 10))]
+        for _ in range(4):
+            expected.append(expected[-1].shift(months=1))
+        self.assertEqual(fires, [i.int_timestamp for i in expected])
+
+    def test_month_day(self):
+        fires = self.upcoming(self.job().monthday(31).at('08:00'), 3, 2024,
+                              2, 1)
+        self.assertEqual(fires, [utc(2024, 3, 31, 8), utc(2024, 5, 31, 8),
+                                 utc(2024, 7, 31, 8)])
+
+    def test_week_day_in_timezone(self):
+        # 2024-02-07 is a wednesday, 09:30 in berlin is 08:30 utc
+        fires = self.upcoming(
+            self.job('Europe/Berlin').weekday(2).at('09:30'), 3, 2024, 2, 1)
+        self.assertEqual(fires, [utc(2024, 2, 7, 8, 30),
+                                 utc(2024, 2, 14, 8, 30),
+                                 utc(2024, 2, 21, 8, 30)])
+
+    def test_day_follows_wall_clock_over_dst(self):
+        fires = self.upcoming(
+            self.job('Europe/Berlin').every(1).day.at('09:00'), 3, 2024, 3,
+            30)
+        self.assertEqual(fires, [utc(2024, 3, 30, 8), utc(2024, 3, 31, 7),
+                                 utc(2024, 4, 1, 7)])
+
+    def test_hours_are_real_seconds_over_dst(self):
+        fires = self.upcoming(self.job('Europe/Berlin').every(3).hour, 4,
+                              2024, 3, 30, 23)
+        self.assertEqual([b - a for a, b in zip(fires, fires[1:])],
+                         [10800] * 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
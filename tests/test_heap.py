@@ -0,0 +1,81 @@
+import asyncio
+import time
+import unittest
+
+from async_cron.clock import SimulatedClock
+from async_cron.job import CronJob
+from async_cron.schedule import Scheduler, HEAP
+
+# 2024-03-04 00:00:00 UTC
+START = 1709510400
+
+
+class HeapWakeupTest(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+
+    def tearDown(self):
+        self.loop.close()
+
+    def test_fires_at_due_times(self):
+        clock = SimulatedClock(START, START + 3600)
+        scheduler = Scheduler(loop=self.loop, mode=HEAP, clock=clock)
+        fires = []
+        scheduler.add_job(
+            CronJob(name='ten', loop=self.loop,
+                    tz='UTC').every(10).minute.go(
+                        lambda: fires.append(clock.time())))
+        self.loop.run_until_complete(scheduler.start())
+        self.assertEqual(fires, [START + i * 600 for i in range(6)])
+
+    def test_idle_until_job_added(self):
+        clock = SimulatedClock(START)
+        scheduler = Scheduler(loop=self.loop, mode=HEAP, clock=clock)
+        fires = []
+
+        async def scenario():
+            task = self.loop.create_task(scheduler.start())
+            await asyncio.sleep(0.01)
+            # no job, the clock is not moved
+            self.assertEqual(clock.time(), START)
+            scheduler.add_job(
+                CronJob(name='min', loop=self.loop, tz='UTC',
+                        run_total=3).every(1).minute.go(
+                            lambda: fires.append(clock.time())))
+            for _ in range(100):
+                if len(fires) == 3:
+                    break
+                await asyncio.sleep(0)
+            task.cancel()
+
+        self.loop.run_until_complete(scenario())
+        self.assertEqual(fires, [START, START + 60, START + 120])
+
+    def test_earlier_job_wakes_scheduler(self):
+        scheduler = Scheduler(loop=self.loop, mode=HEAP)
+        scheduler.add_job(
+            CronJob(name='hour', loop=self.loop).every(1).hour.go(
+                lambda: None))
+        fired = self.loop.create_future()
+
+        def record():
+            if not fired.done():
+                fired.set_result(time.monotonic())
+
+        async def scenario():
+            task = self.loop.create_task(scheduler.start())
+            await asyncio.sleep(0.05)
+            added = time.monotonic()
+            scheduler.add_job(
+                CronJob(name='second',
+                        loop=self.loop).every(1).second.go(record))
+            try:
+                return await asyncio.wait_for(fired, 3) - added
+            finally:
+                task.cancel()
+
+        self.assertLess(self.loop.run_until_complete(scenario()), 1.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import asyncio
+import os
+import shutil
+import tempfile
+import unittest
+
+from async_cron.clock import SimulatedClock
+from async_cron.job import CronJob
+from async_cron.lock import MemoryRunLock, SQLiteRunLock, FileRunLock
+from async_cron.schedule import Scheduler, HEAP
+
+# 2024-03-04 00:00:00 UTC
+START = 1709510400
+
+
+class RunLockTest(unittest.TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    def lock_pairs(self, ttl=3600):
+        """
+        :return: (name, lock of node a, lock of node b) of every backend
+        """
+        memory = MemoryRunLock(ttl)
+        db = os.path.join(self.path, 'lock.db')
+        directory = os.path.join(self.path, 'lock')
+        return [
+            ('memory', memory, memory),
+            ('sqlite', SQLiteRunLock(db, ttl), SQLiteRunLock(db, ttl)),
+            ('file', FileRunLock(directory, ttl),
+             FileRunLock(directory, ttl)),
+        ]
+
+    def test_one_node_wins_each_slot(self):
+        for name, a, b in self.lock_pairs():
+            with self.subTest(name):
+                slots = [('x', START), ('y', START)]
+                self.assertEqual(a.claim(slots, 'a', START), set(slots))
+                self.assertEqual(
+                    b.claim([('x', START), ('y', START + 60)], 'b', START),
+                    {('y', START + 60)})
+                # claiming again keeps the winner
+                self.assertEqual(a.claim(slots, 'a', START), set(slots))
+                self.assertEqual(b.claim(slots, 'b', START), set())
+                self.assertEqual(a.claim([], 'a', START), set())
+
+    def test_claims_expire_by_given_clock(self):
+        for name, a, b in self.lock_pairs(ttl=100):
+            with self.subTest(name):
+                a.purge_interval = 0
+                b.purge_interval = 0
+                slot = ('x', START)
+                self.assertEqual(a.claim([slot], 'a', START), {slot})
+                self.assertEqual(b.claim([slot], 'b', START + 100), set())
+                self.assertEqual(b.claim([slot], 'b', START + 101), {slot})
+
+    def test_purge_interval(self):
+        lock = SQLiteRunLock(os.path.join(self.path, 'lock.db'), ttl=100,
+                             purge_interval=500)
+        slot = ('x', START)
+        lock.claim([slot], 'a', START + 10)
+        # the last purge is too recent, the expired claim is kept
+        self.assertEqual(lock.claim([slot], 'b', START + 200), set())
+        self.assertEqual(lock.claim([slot], 'b', START + 510), {slot})
+
+    def run_node(self, lock, node, offset):
+        """
+        run a minute cron job, an `at` job and a day job on one node,
+        added offset seconds after START, until two hours after START
+        :return: number of runs
+        """
+        loop = asyncio.new_event_loop()
+        runs = []
+        clock = SimulatedClock(START + offset, START + 7200)
+        scheduler = Scheduler(loop=loop, mode=HEAP, clock=clock,
+                              run_lock=lock, node=node)
+        for job in (CronJob(name='cron', tz='UTC').cron('* * * * *'),
+                    CronJob(name='at', tz='UTC').every().hour.at(':00'),
+                    CronJob(name='day', tz='UTC').every(1).day):
+            job.loop = loop
+            scheduler.add_job(job.go(runs.append, job.name))
+        loop.run_until_complete(scheduler.start())
+        loop.close()
+        return runs
+
+    def test_two_nodes_run_each_fire_once(self):
+        for name, a, b in self.lock_pairs(ttl=86400):
+            with self.subTest(name):
+                # added inside the minute before and after midnight
+                runs = self.run_node(a, 'a', -13) + self.run_node(b, 'b', 10)
+                self.assertEqual(runs.count('cron'), 121)
+                self.assertEqual(runs.count('at'), 2)
+                self.assertEqual(runs.count('day'), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import asyncio
+import unittest
+
+from async_cron.job import CronJob, ONCE, ALL, SKIP, MAX_CATCH_UP
+
+# 2024-03-04 00:00:00 UTC
+START = 1709510400
+
+
+class MisfireTest(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.runs = 0
+
+    def tearDown(self):
+        self.loop.close()
+
+    def count_run(self):
+        self.runs += 1
+
+    def stalled_runs(self, misfire=ONCE, misfire_grace=None, stall=300):
+        """
+        run an every minute job at START, then once more after a stall
+        :return: number of runs after the stall
+        """
+        job = CronJob(name='stalled', loop=self.loop, tz='UTC',
+                      misfire=misfire, misfire_grace=misfire_grace).every(
+                          1).minute.go(self.count_run)
+        job.run(START)
+        self.runs = 0
+        job.run(START + stall)
+        # dropped or not, missed runs never run later
+        self.assertEqual(job.next_fire, START + (stall // 60 + 1) * 60)
+        return self.runs
+
+    def test_all_runs_every_missed_run(self):
+        self.assertEqual(self.stalled_runs(ALL), 5)
+        self.assertEqual(self.stalled_runs(ALL, 1000), 5)
+
+    def test_all_drops_runs_later_than_grace(self):
+        self.assertEqual(self.stalled_runs(ALL, 150), 3)
+        self.assertEqual(self.stalled_runs(ALL, 20, stall=330), 0)
+
+    def test_all_is_capped(self):
+        self.assertEqual(self.stalled_runs(ALL, stall=60 * 5000),
+                         MAX_CATCH_UP)
+
+    def test_once_covers_missed_runs(self):
+        self.assertEqual(self.stalled_runs(ONCE), 1)
+        self.assertEqual(self.stalled_runs(ONCE, 150), 1)
+
+    def test_once_drops_runs_later_than_grace(self):
+        self.assertEqual(self.stalled_runs(ONCE, 20, stall=330), 0)
+
+    def test_skip_runs_current_run(self):
+        self.assertEqual(self.stalled_runs(SKIP), 1)
+        self.assertEqual(self.stalled_runs(SKIP, stall=305), 1)
+
+    def test_skip_drops_late_runs(self):
+        self.assertEqual(self.stalled_runs(SKIP, stall=330), 0)
+        self.assertEqual(self.stalled_runs(SKIP, 150, stall=330), 0)
+        self.assertEqual(self.stalled_runs(SKIP, 3, stall=305), 0)
+
+    def test_once_catches_up_where_skip_does_not(self):
+        self.assertEqual(self.stalled_runs(ONCE, stall=330), 1)
+        self.assertEqual(self.stalled_runs(SKIP, stall=330), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import asyncio
+import unittest
+
+from async_cron.clock import SimulatedClock
+from async_cron.job import CronJob
+from async_cron.retry import Retry
+from async_cron.schedule import Scheduler, HEAP
+
+# 2024-03-04 00:00:00 UTC
+START = 1709510400
+
+
+class RetryTest(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.clock = SimulatedClock(START, START + 3600)
+        self.calls = []
+
+    def tearDown(self):
+        self.loop.close()
+
+    def test_delays(self):
+        policy = Retry(attempts=10, delay=1, backoff=2, max_delay=20,
+                       jitter=0)
+        self.assertEqual([policy.delay_of(i) for i in range(1, 7)],
+                         [1, 2, 4, 8, 16, 20])
+
+    def test_jitter_bounds(self):
+        policy = Retry(delay=10, jitter=0.5)
+        for _ in range(100):
+            self.assertTrue(5 <= policy.delay_of(1) <= 15)
+
+    def flaky_run(self, failures=None):
+        self.calls.append(self.clock.time() - START)
+        if failures is None or len(self.calls) <= failures:
+            raise ValueError('failed run')
+
+    def run_hourly(self, failures=None, attempts=3):
+        scheduler = Scheduler(loop=self.loop, mode=HEAP, clock=self.clock,
+                              retry=Retry(attempts=attempts, delay=10,
+                                          jitter=0))
+        scheduler.add_job(
+            CronJob(name='flaky', loop=self.loop, tz='UTC').every(
+                1).hour.go(self.flaky_run, failures))
+        self.loop.run_until_complete(scheduler.start())
+        return scheduler
+
+    def test_backoff_under_simulated_clock(self):
+        self.run_hourly()
+        # the run, then retries 10, 20 and 40 seconds after each failure
+        self.assertEqual(self.calls, [0, 10, 30, 70])
+
+    def test_success_stops_retries(self):
+        scheduler = self.run_hourly(failures=2)
+        self.assertEqual(self.calls, [0, 10, 30])
+        self.assertEqual(scheduler._failures, {})
+
+    def test_job_policy_overrides_scheduler(self):
+        scheduler = Scheduler(loop=self.loop, mode=HEAP, clock=self.clock,
+                              retry=Retry(attempts=3, delay=10, jitter=0))
+        scheduler.add_job(
+            CronJob(name='flaky', loop=self.loop, tz='UTC',
+                    retry=Retry(attempts=1, delay=5, jitter=0)).every(
+                        1).hour.go(self.flaky_run))
+        self.loop.run_until_complete(scheduler.start())
+        self.assertEqual(self.calls, [0, 5])
+
+    def test_retry_respects_max_instances(self):
+        scheduler = Scheduler(loop=self.loop, mode=HEAP, clock=self.clock,
+                              retry=Retry(attempts=3, delay=10, jitter=0))
+        job = CronJob(name='busy', loop=self.loop, tz='UTC',
+                      max_instances=1).every(1).hour.go(self.flaky_run)
+        scheduler.add_job(job)
+        # a run of job is still active
+        job.tasks[self.loop.create_future()] = None
+        scheduler.retry_later('busy')
+        scheduler.run_retries(START + 10)
+        self.assertEqual(self.calls, [])
+        job.tasks.clear()
+        # the refused retry counts, the next one waits twice as long
+        scheduler.retry_later('busy')
+        scheduler.run_retries(START + 20)
+        self.assertEqual(self.calls, [0])
+
+
+if __name__ == '__main__':
+    unittest.main()
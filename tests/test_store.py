@@ -0,0 +1,86 @@
+import asyncio
+import os
+import shutil
+import tempfile
+import unittest
+
+from async_cron.clock import SimulatedClock
+from async_cron.job import CronJob
+from async_cron.schedule import Scheduler, HEAP
+from async_cron.store import MemoryStateStore, SQLiteStateStore
+
+# 2024-03-04 00:00:00 UTC
+START = 1709510400
+
+
+class StateStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    def stores(self):
+        self.db = os.path.join(self.path, 'state.db')
+        return [('memory', MemoryStateStore()),
+                ('sqlite', SQLiteStateStore(self.db))]
+
+    def test_round_trip(self):
+        for name, store in self.stores():
+            with self.subTest(name):
+                states = {'a': (START, START + 60.5, 3),
+                          'b': (None, None, 0)}
+                store.save(states)
+                self.assertEqual(store.load(), states)
+                store.save({'a': (START + 60, START + 120, 4)})
+                store.delete(['b', 'missing'])
+                self.assertEqual(store.load(),
+                                 {'a': (START + 60, START + 120, 4)})
+                store.close()
+
+    def test_sqlite_keeps_states_when_reopened(self):
+        db = os.path.join(self.path, 'state.db')
+        store = SQLiteStateStore(db)
+        store.save({'a': (START, START + 60, 1)})
+        store.close()
+        store = SQLiteStateStore(db)
+        self.assertEqual(store.load(), {'a': (START, START + 60, 1)})
+        store.close()
+
+    def run_scheduler(self, store, start, end, runs):
+        loop = asyncio.new_event_loop()
+        scheduler = Scheduler(loop=loop, mode=HEAP, state_store=store,
+                              clock=SimulatedClock(start, end))
+        scheduler.add_job(
+            CronJob(name='min', loop=loop, tz='UTC').every(1).minute.go(
+                runs.append, 'min'))
+        scheduler.add_job(
+            CronJob(name='once', loop=loop, tz='UTC',
+                    run_total=1).every(1).minute.go(runs.append, 'once'))
+        loop.run_until_complete(scheduler.start())
+        loop.close()
+        return scheduler
+
+    def test_restart_resumes_jobs(self):
+        for name, store in self.stores():
+            with self.subTest(name):
+                runs = []
+                self.run_scheduler(store, START, START + 300, runs)
+                self.assertEqual(runs.count('min'), 5)
+                self.assertEqual(runs.count('once'), 1)
+                if name == 'sqlite':
+                    store.close()
+                    store = SQLiteStateStore(self.db)
+                last_run, next_run, run_count = store.load()['min']
+                self.assertEqual((last_run, next_run, run_count),
+                                 (START + 240, START + 300, 5))
+                runs = []
+                self.run_scheduler(store, START + 300, START + 600, runs)
+                # the run count goes on, the finished job stays done
+                self.assertEqual(runs, ['min'] * 5)
+                self.assertEqual(store.load()['min'][2], 10)
+                store.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import random
+import unittest
+
+from async_cron.wheel import TimingWheel, DAY
+
+# 2024-03-04 00:00:00 UTC
+START = 1709510400
+
+
+class TimingWheelTest(unittest.TestCase):
+    def step(self, wheel, end):
+        """
+        advance one second at a time
+        :return: {key: second it came due}
+        """
+        due = {}
+        for second in range(wheel.current + 1, end + 1):
+            for key in wheel.advance(second):
+                due[key] = second
+        return due
+
+    def test_due_in_current_minute(self):
+        wheel = TimingWheel(START)
+        wheel.add('a', START + 5)
+        wheel.add('b', START + 5.2)
+        self.assertEqual(wheel.advance(START + 4), [])
+        self.assertEqual(wheel.advance(START + 5), ['a'])
+        self.assertEqual(wheel.advance(START + 6), ['b'])
+        self.assertEqual(len(wheel), 0)
+
+    def test_across_minute_and_hour(self):
+        wheel = TimingWheel(START + 50)
+        times = {
+            'next_minute': START + 61,
+            'minute_edge': START + 120,
+            'next_hour': START + 3600 + 7,
+            'hour_edge': START + 7200,
+            'next_day': START + DAY + 3,
+            'far': START + 3 * DAY + 3661,
+        }
+        for key, timestamp in times.items():
+            wheel.add(key, timestamp)
+        self.assertEqual(self.step(wheel, START + 3 * DAY + 4000), times)
+
+    def test_jumps_match_steps(self):
+        rand = random.Random(7)
+        times = {i: START + rand.randrange(2 * DAY) for i in range(300)}
+        stepped, jumped = TimingWheel(START), TimingWheel(START)
+        for key, timestamp in times.items():
+            stepped.add(key, timestamp)
+            jumped.add(key, timestamp)
+        self.assertEqual(self.step(stepped, START + 2 * DAY), times)
+        now = START
+        due = {}
+        while now < START + 2 * DAY:
+            now += rand.randrange(1, 5000)
+            for key in jumped.advance(now):
+                due[key] = now
+                self.assertLessEqual(times[key], now)
+                self.assertGreater(times[key], now - 5000)
+        self.assertEqual(set(due), set(times))
+
+    def test_add_replaces_and_discard(self):
+        wheel = TimingWheel(START)
+        wheel.add('a', START + 3600)
+        wheel.add('a', START + 30)
+        wheel.add('b', START + 90)
+        wheel.discard('b')
+        wheel.discard('missing')
+        self.assertNotIn('b', wheel)
+        self.assertEqual(self.step(wheel, START + 7200), {'a': START + 30})
+
+    def test_passed_time_is_due_next_second(self):
+        wheel = TimingWheel(START)
+        wheel.add('late', START - 100)
+        self.assertEqual(wheel.advance(START + 1), ['late'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import calendar
+import unittest
+
+from dateutil import tz
+
+from async_cron.zone import Zone
+
+HOUR = 3600
+
+
+def utc(*args):
+    return calendar.timegm(args + (0, ) * (6 - len(args)))
+
+
+class ZoneTest(unittest.TestCase):
+    def setUp(self):
+        self.zone = Zone(tz.gettz('Europe/Berlin'))
+
+    def test_offsets(self):
+        self.assertEqual(self.zone.offset(utc(2024, 1, 15)), HOUR)
+        self.assertEqual(self.zone.offset(utc(2024, 7, 15)), 2 * HOUR)
+        # clocks go forward at 01:00 utc, back at 01:00 utc
+        self.assertEqual(self.zone.offset(utc(2024, 3, 31, 1) - 1), HOUR)
+        self.assertEqual(self.zone.offset(utc(2024, 3, 31, 1)), 2 * HOUR)
+        self.assertEqual(self.zone.offset(utc(2024, 10, 27, 1) - 1),
+                         2 * HOUR)
+        self.assertEqual(self.zone.offset(utc(2024, 10, 27, 1)), HOUR)
+
+    def test_table_agrees_with_tzinfo(self):
+        start = utc(2023, 12, 1)
+        for timestamp in range(start, start + 400 * 86400, 3 * HOUR + 7):
+            self.assertEqual(self.zone.offset(timestamp),
+                             self.zone.utcoffset(timestamp))
+        self.assertEqual(self.zone.starts, sorted(self.zone.starts))
+
+    def test_plain_local_time(self):
+        self.assertEqual(self.zone.to_utc(utc(2024, 1, 15, 9)),
+                         utc(2024, 1, 15, 8))
+        self.assertEqual(self.zone.to_local(utc(2024, 7, 15, 7)),
+                         utc(2024, 7, 15, 9))
+
+    def test_skipped_hour_moves_forward(self):
+        # 02:30 does not exist on 2024-03-31, it runs at 03:30 summer time
+        instant = self.zone.to_utc(utc(2024, 3, 31, 2, 30))
+        self.assertEqual(instant, utc(2024, 3, 31, 1, 30))
+        self.assertEqual(self.zone.to_local(instant), utc(2024, 3, 31, 3, 30))
+        self.assertEqual(self.zone.to_utc(utc(2024, 3, 31, 2, 30), instant),
+                         instant)
+
+    def test_repeated_hour_is_its_first_instant(self):
+        # 02:30 happens twice on 2024-10-27, in summer and in winter time
+        local = utc(2024, 10, 27, 2, 30)
+        first, second = utc(2024, 10, 27, 0, 30), utc(2024, 10, 27, 1, 30)
+        self.assertEqual(self.zone.to_utc(local), first)
+        self.assertEqual(self.zone.to_utc(local, first), first)
+        self.assertEqual(self.zone.to_utc(local, first + 1), second)
+        self.assertEqual(self.zone.to_local(first), local)
+        self.assertEqual(self.zone.to_local(second), local)
+
+    def test_fixed_offset(self):
+        zone = Zone(tz.tzoffset(None, 8 * HOUR))
+        self.assertEqual(zone.to_local(utc(2024, 3, 31, 1)),
+                         utc(2024, 3, 31, 9))
+        self.assertEqual(zone.to_utc(utc(2024, 10, 27, 2, 30)),
+                         utc(2024, 10, 26, 18, 30))
+
+
+if __name__ == '__main__':
+    unittest.main()